@@ -0,0 +1,223 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lastfmpy import objects  # noqa: E402
+from lastfmpy.client import LastFMClient  # noqa: E402
+from lastfmpy.decoding import BACKEND  # noqa: E402
+
+from stub import Stub, fixtures, _replicate  # noqa: E402
+
+API = "benchmark"
+# name -> coroutine function taking a client and a page number
+CALLS = {
+    "recent_tracks": lambda client, page: client.user.get_recent_tracks("myerfire", limit=200, page=page),
+    "weekly_track_chart": lambda client, page: client.user.get_weekly_track_chart("myerfire"),
+    "artist_info": lambda client, page: client.artist.get_info("Radiohead"),
+    "track_search": lambda client, page: client.track.search("kyoto", limit=30, page=page),
+}
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def throughput(stub: Stub, name: str, *, requests: int, concurrency: int, pages: int = 10, **kwargs) -> dict:
+    """
+    Sends requests through LastFMClient to the stub as fast as the client allows
+    :param stub: Running stub server
+    :param name: Key of CALLS
+    :param requests: Amount of requests to send
+    :param concurrency: Amount of requests in flight at once
+    :param pages: Amount of distinct pages requested in turn, so the stub answers from its encoded bodies
+    :param kwargs: Passed to LastFMClient
+    :return: dict of requests/sec, latency percentiles and failures
+    """
+    call = CALLS[name]
+    latencies = []
+    failures = 0
+    numbers = iter([index % pages + 1 for index in range(requests)])
+
+    async def worker():
+        nonlocal failures
+        for page in numbers:
+            start = time.perf_counter()
+            try:
+                await call(client, page)
+            except Exception:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    async with LastFMClient(API, url=stub.url, **kwargs) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "requests_per_second": requests / elapsed,
+        "latency_p50": _percentile(latencies, 0.5),
+        "latency_p99": _percentile(latencies, 0.99),
+        "failures": failures,
+    }
+
+
+_FIELDS = {}
+
+
+def _touch(item):
+    # models are lazy, so the fields have to be read for their cost to show up
+    cls = type(item)
+    if cls not in _FIELDS:
+        _FIELDS[cls] = [name for name in dir(cls) if not name.startswith("_") and name != "json"]
+    for name in _FIELDS[cls]:
+        getattr(item, name)
+
+
+def parse(*, items: int, repeat: int) -> dict:
+    """
+    Times building objects.* from decoded fixtures, both constructed and with every field read
+    :param items: Amount of items per page
+    :param repeat: Amount of times each page is parsed, the best run is reported
+    :return: dict of class name to seconds per object (per item of the page for ObjectPage and SearchPage)
+    """
+    loaded = fixtures()
+    recent = _replicate(loaded["user.getrecenttracks"], "user.getrecenttracks", items, 1)["recenttracks"]
+    search = _replicate(loaded["track.search"], "track.search", items, 1)["results"]
+    artist = loaded["artist.getinfo"]["artist"]
+    cases = {
+        "Track": lambda: [objects.Track(item) for item in recent["track"]],
+        "Artist": lambda: [objects.Artist(artist) for _ in range(items)],
+        "Image": lambda: [objects.Image(image) for item in recent["track"] for image in item["image"]],
+        "Tag": lambda: [objects.Tag(tag) for _ in range(items) for tag in artist["tags"]["tag"]],
+        "ObjectPage": lambda: [objects.ObjectPage(recent, objects.Track, "track")],
+        "SearchPage": lambda: [objects.SearchPage(search, objects.Track, "track")],
+    }
+    results = {}
+    for name, case in cases.items():
+        built = touched = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parsed = case()
+            built = min(built, time.perf_counter() - start)
+            start = time.perf_counter()
+            count = 0
+            for item in parsed:
+                for inner in item.items if isinstance(item, (objects.ObjectPage, objects.SearchPage)) else [item]:
+                    _touch(inner)
+                    count += 1
+            touched = min(touched, built + time.perf_counter() - start)
+        results[name] = {"built": built / count, "touched": touched / count}
+    return results
+
+
+def memory(*, items: int) -> dict:
+    """
+    Measures the memory retained by an ObjectPage of recent tracks, not counting the decoded json itself
+    :param items: Amount of tracks on the page
+    :return: dict of bytes per page and per track, before and after every field is read
+    """
+    loaded = fixtures()
+    body = json.dumps(_replicate(loaded["user.getrecenttracks"], "user.getrecenttracks", items, 1))
+    decoded = json.loads(body)["recenttracks"]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    page = objects.ObjectPage(decoded, objects.Track, "track")
+    built = tracemalloc.get_traced_memory()[0] - before
+    for track in page.items:
+        _touch(track)
+    touched = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    count = len(page.items)
+    return {"items": count, "page_bytes": built, "per_item_bytes": built / count,
+            "touched_page_bytes": touched, "touched_per_item_bytes": touched / count}
+
+
+async def main(arguments):
+    report = {"decoder": BACKEND, "throughput": {}}
+    async with Stub(latency=arguments.latency, jitter=arguments.jitter, error_rate=arguments.error_rate,
+                    seed=arguments.seed) as stub:
+        for name in arguments.calls:
+            report["throughput"][name] = await throughput(stub, name, requests=arguments.requests,
+                                                          concurrency=arguments.concurrency,
+                                                          pages=arguments.pages, rate=arguments.rate or None,
+                                                          retries=arguments.retries, coalesce=arguments.coalesce)
+        report["stub"] = {"requests": stub.requests, "errors": stub.errors}
+    report["parse"] = parse(items=arguments.items, repeat=arguments.repeat)
+    report["memory"] = memory(items=arguments.items)
+    return report
+
+
+def _print(report: dict):
+    print(f"decoder: {report['decoder']}")
+    print(f"stub: {report['stub']['requests']} requests, {report['stub']['errors']} error 29 injected")
+    print(f"\n{'call':<20}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+    for name, result in report["throughput"].items():
+        print(f"{name:<20}{result['requests_per_second']:>10.1f}{result['latency_p50'] * 1000:>10.2f}"
+              f"{result['latency_p99'] * 1000:>10.2f}{result['failures']:>8}")
+    print(f"\n{'class':<20}{'built us':>10}{'touched us':>12}   (per object)")
+    for name, result in report["parse"].items():
+        print(f"{name:<20}{result['built'] * 1e6:>10.2f}{result['touched'] * 1e6:>12.2f}")
+    memory_ = report["memory"]
+    print(f"\nObjectPage of {memory_['items']} tracks: {memory_['page_bytes'] / 1024:.1f} KiB "
+          f"({memory_['per_item_bytes']:.0f} B/track), {memory_['touched_page_bytes'] / 1024:.1f} KiB "
+          f"({memory_['touched_per_item_bytes']:.0f} B/track) with every field read")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline lastfmpy benchmarks against a local stub server")
+    parser.add_argument("--calls", nargs="+", choices=list(CALLS), default=list(CALLS))
+    parser.add_argument("--requests", type=int, default=500, help="requests sent per call")
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight at once")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the stub waits before answering")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with error 29")
+    parser.add_argument("--rate", type=float, default=0, help="client ratelimit in requests/sec (0 disables it)")
+    parser.add_argument("--pages", type=int, default=10, help="distinct pages requested per call")
+    parser.add_argument("--coalesce", action="store_true", help="let identical in-flight requests share a response")
+    parser.add_argument("--retries", type=int, default=3, help="retries per request")
+    parser.add_argument("--items", type=int, default=200, help="items per page for the parse and memory benchmarks")
+    parser.add_argument("--repeat", type=int, default=20, help="parse runs per class, the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as json")
+    arguments = parser.parse_args()
+    result = asyncio.run(main(arguments))
+    if arguments.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print(result)
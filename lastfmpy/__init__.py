@@ -27,6 +27,15 @@ __author__ = "myerfire"
 __license__ = "MIT"
 __version__ = "1.2"
 
-from .client import LastFM
+from .client import LastFM, LastFMClient
 from .exceptions import *
 from .objects import *
+from .cache import ResponseCache, MemoryCache, SQLiteCache
+from .charts import ChartIndex
+from .circuit import CircuitBreaker
+from .corrections import CorrectionIndex
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .store import EntityStore
+from .stats import ListeningStats
+from .watcher import NowPlayingWatcher, NowPlayingEvent
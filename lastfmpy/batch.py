@@ -0,0 +1,86 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Hashable, List, Tuple
+
+
+async def _run(function: Callable[..., Awaitable], arguments: list,
+               concurrency: int) -> AsyncIterator[Tuple[int, object]]:
+    results = asyncio.Queue()
+    pending = iter(enumerate(arguments))
+
+    async def worker():
+        for index, argument in pending:
+            try:
+                result = await function(*argument)
+            except Exception as error:  # returned in place of the result so one failure does not fail the batch
+                result = error
+            await results.put((index, result))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(arguments)))]
+    try:
+        for _ in range(len(arguments)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+
+
+def _unique(arguments: list, key: Callable[[tuple], Hashable]) -> Tuple[list, list]:
+    unique, positions, indexes = [], [], {}
+    for argument in arguments:
+        identifier = key(argument)
+        if identifier not in indexes:
+            indexes[identifier] = len(unique)
+            unique.append(argument)
+        positions.append(indexes[identifier])
+    return unique, positions
+
+
+async def gather(function: Callable[..., Awaitable], arguments: List[tuple], *, concurrency: int = 8,
+                 key: Callable[[tuple], Hashable] = tuple) -> list:
+    """
+    Calls function once for every distinct tuple of arguments, at most concurrency at a time
+    :param function: Coroutine function
+    :param arguments: Tuples of positional arguments to call function with
+    :param concurrency: Maximum amount of calls running at once
+    :param key: Arguments with the same key are only called with once
+    :return: list of results in the order of arguments, exceptions take the place of the result of failed calls
+    """
+    unique, positions = _unique(arguments, key)
+    results = [None] * len(unique)
+    async for index, result in _run(function, unique, concurrency):
+        results[index] = result
+    return [results[position] for position in positions]
+
+
+async def as_completed(function: Callable[..., Awaitable], arguments: List[tuple], *, concurrency: int = 8,
+                       key: Callable[[tuple], Hashable] = tuple) -> AsyncIterator[Tuple[tuple, object]]:
+    """
+    Same as gather but yields (arguments, result) as soon as each distinct call finishes
+    """
+    unique, _ = _unique(arguments, key)
+    async for index, result in _run(function, unique, concurrency):
+        yield unique[index], result
@@ -0,0 +1,288 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .utils import MINUTE, HOUR, DAY
+
+DEFAULT_TTLS = {
+    "album.getinfo": 6 * HOUR,
+    "album.gettoptags": 6 * HOUR,
+    "album.search": HOUR,
+    "artist.getcorrection": DAY,
+    "artist.getinfo": 6 * HOUR,
+    "artist.getsimilar": DAY,
+    "artist.gettopalbums": HOUR,
+    "artist.gettoptags": 6 * HOUR,
+    "artist.gettoptracks": HOUR,
+    "artist.search": HOUR,
+    "chart.gettopartists": 10 * MINUTE,
+    "chart.gettoptags": 10 * MINUTE,
+    "chart.gettoptracks": 10 * MINUTE,
+    "track.getcorrection": DAY,
+    "track.getinfo": 6 * HOUR,
+    "track.getsimilar": DAY,
+    "track.gettoptags": 6 * HOUR,
+    "track.search": HOUR,
+    "user.getfriends": 10 * MINUTE,
+    "user.getinfo": 5 * MINUTE,
+    "user.getlovedtracks": MINUTE,
+    "user.getrecenttracks": 10,
+    "user.gettopalbums": 10 * MINUTE,
+    "user.gettopartists": 10 * MINUTE,
+    "user.gettoptags": 10 * MINUTE,
+    "user.gettoptracks": 10 * MINUTE,
+    "user.getweeklyalbumchart": HOUR,
+    "user.getweeklyartistchart": HOUR,
+    "user.getweeklytrackchart": HOUR,
+}  # seconds
+
+STALE_TTLS = {
+    "chart.gettopartists": HOUR,
+    "chart.gettoptags": HOUR,
+    "chart.gettoptracks": HOUR,
+    "user.getrecenttracks": MINUTE,
+}  # seconds, a preset for ResponseCache(stale_ttls=...)
+
+
+def key(method: str, params: dict) -> str:
+    """
+    Builds the cache key of a request, parameters that would not be sent are ignored
+    :param method: last.fm API method
+    :param params: Parameters of the request
+    :return: str
+    """
+    parameters = "&".join([f"{name}={value}" for name, value in sorted(params.items()) if bool(value)])
+    return f"{method.lower()}?{parameters}"
+
+
+class CacheBackend:
+    """
+    Interface of the storage used by ResponseCache
+    Entries are (stored_at, value) tuples where stored_at is a UNIX timestamp, expiry is decided by ResponseCache
+    """
+
+    def get(self, key: str) -> Optional[Tuple[float, dict]]:
+        raise NotImplementedError
+
+    def set(self, key: str, stored_at: float, value: dict):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-memory backend that evicts the least recently used entry once maxsize is reached
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[float, dict]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, stored_at: float, value: dict):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk backend so that several processes (or restarts of one) can reuse responses
+    Evicts the least recently used entries once maxsize is reached
+    """
+
+    def __init__(self, path: str = "lastfmpy-cache.sqlite", maxsize: int = 100000, *, flush_every: int = 100):
+        """
+        :param path: File the entries are stored in
+        :param maxsize: Amount of entries kept, the least recently used are deleted down to 90% of it once it is passed
+        :param flush_every: Amount of reads after which the times entries were last used are written to the file
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.flush_every = flush_every
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL, used_at REAL, value TEXT)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at)")
+        self._size = len(self)  # counts replaced entries too, recounted before anything is evicted
+        self._used = {}  # key -> time it was last read, not written yet
+
+    def get(self, key: str) -> Optional[Tuple[float, dict]]:
+        row = self._connection.execute("SELECT stored_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._used[key] = time.time()
+        if len(self._used) >= self.flush_every:
+            self.flush()
+        return row[0], json.loads(row[1])
+
+    def flush(self):
+        """
+        Writes the times entries were last used, which are batched instead of written on every read
+        """
+        if not self._used:
+            return
+        used, self._used = self._used, {}
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany("UPDATE cache SET used_at = ? WHERE key = ?",
+                                         [(used_at, key) for key, used_at in used.items()])
+
+    def set(self, key: str, stored_at: float, value: dict):
+        self._used.pop(key, None)
+        self._connection.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                                 (key, stored_at, time.time(), json.dumps(value)))
+        self._size += 1
+        if self._size > self.maxsize:
+            self._size = len(self)
+            overflow = self._size - int(self.maxsize * 0.9)
+            if self._size > self.maxsize and overflow > 0:
+                self.flush()
+                self._connection.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used_at LIMIT ?)", (overflow,))
+                self._size = len(self)
+
+    def delete(self, key: str):
+        self._used.pop(key, None)
+        self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._used.clear()
+        self._connection.execute("DELETE FROM cache")
+        self._size = 0
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Caches API responses by method and parameters for a per-method amount of time
+    """
+
+    def __init__(self, backend: CacheBackend = None, *, ttls: dict = None, default_ttl: float = 0,
+                 stale_ttls: dict = None):
+        """
+        :param backend: Where entries are stored, defaults to a MemoryCache
+        :param ttls: Seconds responses of each method are fresh for, merged over DEFAULT_TTLS
+        :param default_ttl: Seconds responses of methods missing from ttls are fresh for (0 to not cache them)
+        :param stale_ttls: Seconds responses of each method may be served for while they are refreshed in the
+        background once they are no longer fresh (stale-while-revalidate), see STALE_TTLS for a preset
+        """
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.stale_ttls = stale_ttls or {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def ttl(self, method: str) -> float:
+        return self.ttls.get(method.lower(), self.default_ttl)
+
+    def get(self, method: str, params: dict) -> Optional[dict]:
+        """
+        :return: The cached response if there is a fresh one, None otherwise
+        """
+        ttl = self.ttl(method)
+        if ttl <= 0:
+            return None
+        entry = self.backend.get(key(method, params))
+        if entry is None or time.time() - entry[0] > ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def lookup(self, method: str, params: dict) -> Tuple[Optional[dict], bool]:
+        """
+        Same as get but also returns responses that are past their TTL and still within their stale TTL
+        :return: (response, whether it is fresh), (None, False) if there is no usable response
+        """
+        ttl = self.ttl(method)
+        if ttl <= 0:
+            return None, False
+        entry = self.backend.get(key(method, params))
+        age = time.time() - entry[0] if entry is not None else None
+        if entry is not None and age <= ttl:
+            self.hits += 1
+            return entry[1], True
+        if entry is not None and age <= self.stale_ttls.get(method.lower(), 0):
+            self.stale_hits += 1
+            return entry[1], False
+        self.misses += 1
+        return None, False
+
+    def get_stale(self, method: str, params: dict) -> Optional[dict]:
+        """
+        :return: The cached response regardless of its age if there is one, None otherwise
+        """
+        entry = self.backend.get(key(method, params))
+        return entry[1] if entry is not None else None
+
+    def set(self, method: str, params: dict, value: dict):
+        if self.ttl(method) > 0:
+            self.backend.set(key(method, params), time.time(), value)
+
+    def clear(self):
+        self.backend.clear()
+        self.hits = self.misses = self.stale_hits = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
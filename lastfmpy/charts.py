@@ -0,0 +1,194 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import bisect
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from . import objects
+from . import utils
+
+WEEK = 7 * utils.DAY
+WEEKLY = 1602417600  # a sunday at noon UTC, the weekly charts of last.fm start at that time of the week
+KINDS = {"artist": objects.Artist, "album": objects.Album, "track": objects.Track}
+
+
+def _mbid(value) -> str:
+    return (value.get("mbid") or "") if isinstance(value, dict) else ""
+
+
+class ChartIndex:
+    """
+    Artist, album and track charts of a user computed from their scrobbles instead of the weekly chart methods
+    Plays are counted in buckets of period seconds, so adding scrobbles only touches the buckets they fall in
+    and a chart over any span of buckets is the sum of their counters
+    The charts are objects.ObjectPage with the same items and attributes as User.get_weekly_*_chart
+    """
+
+    def __init__(self, user: str = None, *, period: int = WEEK, origin: int = WEEKLY):
+        """
+        :param user: Username put in the attributes of the charts
+        :param period: Seconds covered by a bucket, the default is a week so that the charts line up with last.fm's
+        :param origin: UNIX timestamp of the start of any bucket, the others are whole periods before or after it
+        """
+        self.user = user
+        self.period = period
+        self.origin = origin
+        self.buckets: Dict[int, Dict[str, Counter]] = {}  # start of bucket -> kind -> key -> plays
+        self.starts: List[int] = []  # sorted starts of the buckets
+        self.entities: Dict[str, dict] = {kind: {} for kind in KINDS}  # kind -> key -> json of the first scrobble
+        self.latest = 0  # UNIX timestamp of the newest scrobble added
+        self.scrobbles = 0
+
+    def bucket(self, uts: int) -> int:
+        """
+        :return: Start of the bucket the UNIX timestamp falls in
+        """
+        return uts - (uts - self.origin) % self.period
+
+    def _counters(self, start: int) -> Dict[str, Counter]:
+        counters = self.buckets.get(start)
+        if counters is None:
+            counters = self.buckets[start] = {kind: Counter() for kind in KINDS}
+            bisect.insort(self.starts, start)
+        return counters
+
+    def add(self, tracks: Iterable[objects.Track]) -> set:
+        """
+        Counts scrobbles, the now playing track is skipped
+        Every scrobble passed is counted, so when updating pass only scrobbles newer than latest (see update)
+        :param tracks: objects.Track from recent tracks, for example from User.export_recent_tracks
+        :return: set of starts of the buckets that changed
+        """
+        changed = set()
+        entities = self.entities
+        for track in tracks:
+            uts = track.uts
+            if not uts or track.playing:
+                continue
+            json = track.json
+            artist, album = json.get("artist"), json.get("album")
+            keys = {"artist": utils.text(artist), "album": (utils.text(artist), utils.text(album)),
+                    "track": (utils.text(artist), json.get("name") or "")}
+            start = self.bucket(uts)
+            counters = self._counters(start)
+            for kind, key in keys.items():
+                if kind == "album" and not key[1]:
+                    continue
+                counters[kind][key] += 1
+                if key not in entities[kind]:
+                    entities[kind][key] = json
+            changed.add(start)
+            self.latest = max(self.latest, uts)
+            self.scrobbles += 1
+        return changed
+
+    async def update(self, client, user: str = None, *, concurrency: int = 4, timeout: float = None) -> set:
+        """
+        Downloads and adds the scrobbles made after latest, the first update downloads the whole history
+        :param client: LastFMClient
+        :param user: Username of the user, defaults to the user of the index
+        :param concurrency: Maximum amount of pages being requested at once
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: set of starts of the buckets that changed
+        """
+        self.user = user or self.user
+        tracks = [track async for track in client.user.export_recent_tracks(
+            self.user, from_=self.latest + 1 if self.latest else 0, concurrency=concurrency, timeout=timeout)]
+        return self.add(tracks)
+
+    def chart_list(self) -> List[Tuple[int, int]]:
+        """
+        Like user.getWeeklyChartList of the API, but only buckets with scrobbles are listed
+        :return: list of (from, to) UNIX timestamps, oldest first
+        """
+        return [(start, start + self.period) for start in self.starts]
+
+    def _span(self, from_, to) -> Tuple[int, int]:
+        if from_ is None and to is None:  # like the api, the newest chart by default
+            start = self.starts[-1] if self.starts else self.bucket(self.origin)
+            return start, start + self.period
+        first = self.starts[0] if self.starts else self.origin
+        return int(from_) if from_ is not None else first, int(to) if to is not None else self.latest + 1
+
+    def counts(self, kind: str, from_: int = None, to: int = None) -> Counter:
+        """
+        Plays of every artist, album or track in the buckets that start between from_ (inclusive) and to (exclusive)
+        :param kind: artist, album or track
+        :return: Counter of key to plays, keys are artist names, (artist, album) or (artist, track) tuples
+        """
+        from_, to = self._span(from_, to)
+        counts = Counter()
+        for start in self.starts[bisect.bisect_left(self.starts, from_):bisect.bisect_left(self.starts, to)]:
+            counts.update(self.buckets[start][kind])
+        return counts
+
+    def _item(self, kind: str, key, plays: int, rank: int) -> dict:
+        json = self.entities[kind][key]
+        artist = json.get("artist")
+        if kind == "artist":
+            return {"name": key, "mbid": _mbid(artist), "url": artist.get("url", "") if isinstance(artist, dict)
+                    else "", "playcount": str(plays), "@attr": {"rank": str(rank)}}
+        item = {"artist": {"#text": key[0], "mbid": _mbid(artist)}, "name": key[1], "playcount": str(plays),
+                "@attr": {"rank": str(rank)}}
+        if kind == "album":
+            item["mbid"] = _mbid(json.get("album"))
+        else:
+            item.update(mbid=json.get("mbid", ""), url=json.get("url", ""), image=json.get("image", []))
+        return item
+
+    def chart(self, kind: str, from_: int = None, to: int = None, *, limit: int = None) -> objects.ObjectPage:
+        """
+        Chart of the buckets that start between from_ (inclusive) and to (exclusive)
+        With neither from_ nor to this is the chart of the newest bucket, like the weekly chart methods
+        :param kind: artist, album or track
+        :param from_: UNIX timestamp, defaults to the first bucket
+        :param to: UNIX timestamp, defaults to after the latest scrobble
+        :param limit: Amount of entries, all of them by default
+        :return: objects.ObjectPage of objects.Artist, objects.Album or objects.Track, most played first
+        """
+        span = self._span(from_, to)
+        ranked = sorted(self.counts(kind, *span).items(), key=lambda item: (-item[1], item[0]))[:limit]
+        items = [self._item(kind, key, plays, rank) for rank, (key, plays) in enumerate(ranked, 1)]
+        json = {kind: items, "@attr": {"user": self.user, "from": str(span[0]), "to": str(span[1]), "page": "1",
+                                       "perPage": str(len(items)), "totalPages": "1", "total": str(len(items))}}
+        return objects.ObjectPage(json, KINDS[kind], kind)
+
+    def get_weekly_artist_chart(self, *, from_: int = None, to: int = None, limit: int = None) -> objects.ObjectPage:
+        """
+        Same as User.get_weekly_artist_chart without a request, see chart
+        """
+        return self.chart("artist", from_, to, limit=limit)
+
+    def get_weekly_album_chart(self, *, from_: int = None, to: int = None, limit: int = None) -> objects.ObjectPage:
+        """
+        Same as User.get_weekly_album_chart without a request, see chart
+        """
+        return self.chart("album", from_, to, limit=limit)
+
+    def get_weekly_track_chart(self, *, from_: int = None, to: int = None, limit: int = None) -> objects.ObjectPage:
+        """
+        Same as User.get_weekly_track_chart without a request, see chart
+        """
+        return self.chart("track", from_, to, limit=limit)
@@ -0,0 +1,133 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import time
+from collections import deque
+from typing import Optional
+
+from . import exceptions
+from .retry import RetryPolicy
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests for a while once too many recent requests failed because of last.fm
+    After recovery seconds a few trial requests are let through, the circuit closes again if they succeed
+    """
+
+    def __init__(self, failure_rate: float = 0.5, *, window: int = 20, min_calls: int = 10, recovery: float = 30.0,
+                 trial_calls: int = 1):
+        """
+        :param failure_rate: Fraction of the last window requests that have to fail for the circuit to open
+        :param window: Amount of recent requests the failure rate is calculated over
+        :param min_calls: Amount of requests that have to be made before the circuit can open
+        :param recovery: Seconds the circuit stays open for before trial requests are let through
+        :param trial_calls: Amount of trial requests let through at once while half-open
+        """
+        self.threshold = failure_rate
+        self.min_calls = min_calls
+        self.recovery = recovery
+        self.trial_calls = trial_calls
+        self.state = CLOSED
+        self.opened = 0  # times the circuit opened
+        self.rejected = 0  # requests that were not sent because the circuit was open
+        self._results = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trials = 0
+        self._half_opened = 0  # times the circuit became half-open, identifies the trial calls of each time
+
+    @staticmethod
+    def counts(error: BaseException) -> bool:
+        """
+        Whether an error counts as a failure of last.fm
+        Ratelimit errors are caused by the client and do not count
+        """
+        if isinstance(error, exceptions.RatelimitExceededError) or (
+                isinstance(error, exceptions.HTTPError) and error.status == 429):
+            return False
+        return RetryPolicy.is_transient(error)
+
+    @property
+    def failure_rate(self) -> float:
+        return self._results.count(False) / len(self._results) if self._results else 0.0
+
+    @property
+    def retry_after(self) -> float:
+        """
+        Seconds until trial requests are let through, 0 if the circuit is not open
+        """
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.recovery - time.monotonic())
+
+    def before(self) -> Optional[int]:
+        """
+        Called before a request is sent
+        :return: Token to pass to success or failure once the request is done, not None for trial requests
+        :raises exceptions.CircuitOpenError: If the request should not be sent
+        """
+        if self.state == OPEN and self.retry_after == 0:
+            self.state = HALF_OPEN
+            self._trials = 0
+            self._half_opened += 1
+        if self.state == HALF_OPEN and self._trials < self.trial_calls:
+            self._trials += 1
+            return self._half_opened
+        if self.state == CLOSED:
+            return None
+        self.rejected += 1
+        raise exceptions.CircuitOpenError(f"Circuit breaker is {self.state}, last.fm seems to be having issues")
+
+    def _trial(self, token: Optional[int]) -> bool:
+        # requests sent before the circuit became half-open do not decide whether it closes again
+        return self.state == HALF_OPEN and token is not None and token == self._half_opened
+
+    def success(self, token: Optional[int] = None):
+        """
+        :param token: What before returned for the request
+        """
+        if self._trial(token):
+            self.state = CLOSED
+            self._results.clear()
+        self._results.append(True)
+
+    def failure(self, error: BaseException, token: Optional[int] = None):
+        """
+        :param token: What before returned for the request
+        """
+        if not self.counts(error):
+            # does not tell anything about last.fm, give the trial slot back
+            if self._trial(token):
+                self._trials -= 1
+            return
+        self._results.append(False)
+        if self._trial(token) or (self.state == CLOSED and
+                                  len(self._results) >= self.min_calls and self.failure_rate >= self.threshold):
+            self.state = OPEN
+            self.opened += 1
+            self._opened_at = time.monotonic()
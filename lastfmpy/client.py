@@ -22,38 +22,99 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import time
+
+from . import batch
+from . import columnar
 from . import objects
+from . import pagination
 from . import request
+from . import stats
+from . import utils
+from .corrections import CorrectionIndex, correction
+from .store import EntityStore
 
 
 class LastFMClient:
     """Main class that contains features for all the endpoints of the last.fm API that do not require authentication"""
 
-    def __init__(self, api: str):
+    def __init__(self, api: str, *, store: EntityStore = None, corrections: CorrectionIndex = None,
+                 pool: objects.InternPool = None, **kwargs):
+        """
+        :param api: API key
+        :param store: store.EntityStore that artist, album and track information is read from before it is requested
+        :param corrections: corrections.CorrectionIndex that learns name corrections from get_correction and
+        autocorrected get_info responses and applies them before requests are sent
+        :param pool: objects.InternPool that the objects of every page are built through, so that artists, albums,
+        images and tags repeated across pages are kept once
+        :param kwargs: Passed to request.HTTPClient (connection pool and ratelimit settings)
+        """
         self.api = api
-        self.album = self.albums = Album(api)
-        self.artist = self.artists = Artist(api)
-        self.chart = self.charts = Chart(api)
-        self.track = self.tracks = Track(api)
-        self.user = self.users = User(api)
+        self.http = request.HTTPClient(api, **kwargs)
+        self.store = store
+        self.corrections = corrections
+        self.pool = pool
+        self.album = self.albums = Album(api, self.http, store, corrections, pool)
+        self.artist = self.artists = Artist(api, self.http, store, corrections, pool)
+        self.chart = self.charts = Chart(api, self.http, pool)
+        self.track = self.tracks = Track(api, self.http, store, corrections, pool)
+        self.user = self.users = User(api, self.http, pool)
+
+    async def close(self):
+        """
+        Closes the connection pool shared by every endpoint
+        """
+        await self.http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+
+def _is_now_playing(track: objects.Track) -> bool:
+    return track.playing
+
+
+def _scrobble_key(track: objects.Track) -> tuple:
+    return track.played, track.name, str(track.artist)
+
+
+def _page(json: dict, object_, string: str, columns: bool, pool: objects.InternPool = None):
+    return columnar.ColumnPage(json, string) if columns else objects.ObjectPage(json, object_, string, pool)
 
 
-async def LastFM(api: str) -> LastFMClient:
+def _normalized(names: tuple) -> tuple:
+    return tuple(utils.normalize(name) for name in names)
+
+
+async def LastFM(api: str, **kwargs) -> LastFMClient:
     """Class factory for LastFMClient objects
-    Checks if the API key is valid with an example call"""
-    client = LastFMClient(api)
-    _ = client.user.get_info("myerfire")
+    Checks if the API key is valid with an example call
+    Keyword arguments are passed to LastFMClient"""
+    client = LastFMClient(api, **kwargs)
+    try:
+        await client.user.get_info("myerfire")
+    except BaseException:
+        await client.close()
+        raise
     return client
 
 
 class Album:
     """The features of the API in the album method"""
 
-    def __init__(self, api):
+    def __init__(self, api, http: request.HTTPClient = None, store: EntityStore = None,
+                 corrections: CorrectionIndex = None, pool: objects.InternPool = None):
         self.api = api
+        self.http = http or request.HTTPClient(api)
+        self.store = store
+        self.corrections = corrections
+        self.pool = pool
 
     async def get_info(self, artist: str = None, album: str = None, mbid: str = None, *, autocorrect: bool = False,
-                       username: str = None) -> objects.Album:
+                       username: str = None, timeout: float = None) -> objects.Album:
         """
         Gets relevant information of an album from an artist and album name
         :param artist: Artist name
@@ -61,267 +122,602 @@ class Album:
         :param mbid:
         :param autocorrect: Whether the request should autocorrect errors in name
         :param username: The username to fetch relevant information about the album for (amount of plays, etc)
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: lastfmpy.Album
         """
-        json = await request.get(self.api, "album.getinfo", artist=artist, album=album, mbid=mbid,
-                                 autocorrect=autocorrect,
-                                 username=username)
+        requested = (artist, album)
+        correct = autocorrect and not mbid and self.corrections is not None
+        if correct:
+            artist, album = self.corrections.resolve("album", requested)
+        stored = self.store is not None and not username
+        if stored:
+            json = self.store.get("album", (artist, album), mbid=mbid, aliases=autocorrect)
+            if json is not None:
+                return objects.Album(json)
+        json = await self.http.get("album.getinfo", artist=artist, album=album, mbid=mbid,
+                                   autocorrect=autocorrect,
+                                   username=username, timeout=timeout)
+        if stored:
+            self.store.set("album", json["album"], (artist, album) if autocorrect else None)
+        if correct:
+            self.corrections.set("album", requested, json["album"])
         return objects.Album(json["album"])
 
-    async def get_top_tags(self, artist: str, album: str, *, autocorrect: bool = False, username: str = None) -> list:
+    async def get_info_many(self, albums: list, *, autocorrect: bool = False, username: str = None,
+                            concurrency: int = 8, timeout: float = None) -> list:
+        """
+        Gets relevant information of many albums, requesting several at once
+        Albums that only differ in case or whitespace are requested once
+        :param albums: list of (artist name, album name) tuples
+        :param autocorrect: Whether the requests should autocorrect errors in name
+        :param username: The username to fetch relevant information about the albums for (amount of plays, etc)
+        :param concurrency: Maximum amount of requests sent at once
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: list of lastfmpy.Album in the order of albums, with the exception in place of albums that failed
+        """
+        return await batch.gather(lambda artist, album: self.get_info(artist, album, autocorrect=autocorrect,
+                                                                      username=username, timeout=timeout),
+                                  albums, concurrency=concurrency, key=_normalized)
+
+    def iter_info_many(self, albums: list, *, autocorrect: bool = False, username: str = None,
+                       concurrency: int = 8, timeout: float = None):
+        """
+        Same as get_info_many but yields ((artist name, album name), result) as each request finishes
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of tuples
+        """
+        return batch.as_completed(lambda artist, album: self.get_info(artist, album, autocorrect=autocorrect,
+                                                                      username=username, timeout=timeout),
+                                  albums, concurrency=concurrency, key=_normalized)
+
+    async def get_top_tags(self, artist: str, album: str, *, autocorrect: bool = False, username: str = None,
+                           timeout: float = None) -> list:
         """
         Get top overall tags of an album from an artist and album name
         :param artist: Artist name
         :param album: Album name
         :param autocorrect: Whether the request should autocorrect errors in name
         :param username: The username to fetch relevant information about the album for (amount of plays, etc)
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: list of lastfmpy.Tag
         """
-        json = await request.get(self.api, "album.gettoptags", artist=artist, album=album, autocorrect=autocorrect,
-                                 username=username)
+        json = await self.http.get("album.gettoptags", artist=artist, album=album, autocorrect=autocorrect,
+                                   username=username, timeout=timeout)
         return [objects.Tag(tag) for tag in json["toptags"]["tag"]]
 
-    async def search(self, album: str, *, limit: int = 0, page: int = 0) -> objects.SearchPage:
+    async def search(self, album: str, *, limit: int = 0, page: int = 0, timeout: float = None) -> objects.SearchPage:
         """
         Searches for an album based on a string
         :param album: Album to search for
         :param limit: Amount of search results to retrieve
         :param page: Page of search results
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: lastfmpy.SearchPage
         """
-        json = await request.get(self.api, "album.search", album=album, limit=limit, page=page)
-        return objects.SearchPage(json["results"], objects.Album, "albummatches")
+        json = await self.http.get("album.search", album=album, limit=limit, page=page, timeout=timeout)
+        return objects.SearchPage(json["results"], objects.Album, "album", self.pool)
+
+    def iter_search(self, album: str, *, limit: int = 50, max_items: int = None, prefetch: bool = True,
+                    timeout: float = None):
+        """
+        Iterates over the search results of every page
+        :param album: Album to search for
+        :param limit: Amount of search results requested per page
+        :param max_items: Stop after this many results
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of lastfmpy.Album
+        """
+        return pagination.paginate(
+            lambda page: self.search(album, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
 
 
 class Artist:
-    def __init__(self, api):
+    def __init__(self, api, http: request.HTTPClient = None, store: EntityStore = None,
+                 corrections: CorrectionIndex = None, pool: objects.InternPool = None):
         """
         Wrapper on the artist endpoint of the last.fm API
         :param api:
+        :param http: The HTTPClient shared with the other endpoints
+        :param store: The EntityStore shared with the other endpoints
+        :param corrections: The CorrectionIndex shared with the other endpoints
+        :param pool: The InternPool shared with the other endpoints
         """
         self.api = api
+        self.http = http or request.HTTPClient(api)
+        self.store = store
+        self.corrections = corrections
+        self.pool = pool
 
-    async def get_info(self, artist: str, *, autocorrect: bool = False, username: str = None) -> objects.Artist:
+    async def get_info(self, artist: str, *, autocorrect: bool = False, username: str = None,
+                       timeout: float = None) -> objects.Artist:
         """
         Gets relevant information of an artist from an artist name
         :param artist: Artist name
         :param autocorrect: Whether to autocorrect the artist name
         :param username: The username to fetch relevant information about the album for (amount of plays, etc)
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: lastfmpy.Artist
         """
-        json = await request.get(self.api, "artist.getinfo", artist=artist, autocorrect=autocorrect,
-                                 username=username)
+        requested = (artist,)
+        correct = autocorrect and self.corrections is not None
+        if correct:
+            artist, = self.corrections.resolve("artist", requested)
+        stored = self.store is not None and not username
+        if stored:
+            json = self.store.get("artist", (artist,), aliases=autocorrect)
+            if json is not None:
+                return objects.Artist(json)
+        json = await self.http.get("artist.getinfo", artist=artist, autocorrect=autocorrect,
+                                   username=username, timeout=timeout)
+        if stored:
+            self.store.set("artist", json["artist"], (artist,) if autocorrect else None)
+        if correct:
+            self.corrections.set("artist", requested, json["artist"])
         return objects.Artist(json["artist"])
 
-    async def get_correction(self, artist: str) -> objects.Artist:
+    async def get_info_many(self, artists: list, *, autocorrect: bool = False, username: str = None,
+                            concurrency: int = 8, timeout: float = None) -> list:
         """
-        Gets the correction of an artist name
-        :param artist: Artist name
-        :return: objects.Artist
+        Gets relevant information of many artists, requesting several at once
+        Artist names that only differ in case or whitespace are requested once
+        :param artists: list of artist names
+        :param autocorrect: Whether to autocorrect the artist names
+        :param username: The username to fetch relevant information about the artists for (amount of plays, etc)
+        :param concurrency: Maximum amount of requests sent at once
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: list of lastfmpy.Artist in the order of artists, with the exception in place of artists that failed
         """
-        json = await request.get(self.api, "artist.getcorrection", artist=artist)
-        return objects.Artist(json["artist"])
+        return await batch.gather(
+            lambda artist: self.get_info(artist, autocorrect=autocorrect, username=username, timeout=timeout),
+            [(artist,) for artist in artists], concurrency=concurrency, key=_normalized)
+
+    def iter_info_many(self, artists: list, *, autocorrect: bool = False, username: str = None,
+                       concurrency: int = 8, timeout: float = None):
+        """
+        Same as get_info_many but yields ((artist name,), result) as each request finishes
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of tuples
+        """
+        return batch.as_completed(
+            lambda artist: self.get_info(artist, autocorrect=autocorrect, username=username, timeout=timeout),
+            [(artist,) for artist in artists], concurrency=concurrency, key=_normalized)
 
-    async def get_similar(self, artist: str, *, autocorrect: bool = False, limit: int = 0) -> list:
+    async def get_correction(self, artist: str, *, timeout: float = None) -> objects.Artist:
+        """
+        Gets the correction of an artist name
+        Without a request if the CorrectionIndex already knows the name
+        :param artist: Artist name
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
+        :return: objects.Artist, None if last.fm has no correction
+        """
+        if self.corrections is not None:
+            found = self.corrections.get("artist", (artist,))
+            if found is not None:
+                return objects.Artist({"name": found.names[0], "mbid": found.mbid, "url": found.url})
+        json = await self.http.get("artist.getcorrection", artist=artist, timeout=timeout)
+        corrected = correction(json, "artist")
+        if corrected is None:
+            return None
+        if self.corrections is not None:
+            self.corrections.set("artist", (artist,), corrected)
+        return objects.Artist(corrected)
+
+    async def get_similar(self, artist: str, *, autocorrect: bool = False, limit: int = 0,
+                          timeout: float = None) -> list:
         """
         Gets similar artists
         :param artist: Artist name
         :param autocorrect: Whether to autocorrect the artist name
         :param limit: Amount of similar artists to get
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: list of objects.Artist
         """
-        json = await request.get(self.api, "artist.getsimilar", artist=artist, limit=limit, autocorrect=autocorrect)
+        json = await self.http.get("artist.getsimilar", artist=artist, limit=limit, autocorrect=autocorrect,
+                                   timeout=timeout)
         return [objects.Artist(artist) for artist in json["similarartists"]["artist"]]
 
     async def get_top_albums(self, artist: str, *, autocorrect: bool = False, limit: int = 0,
-                             page: int = 0) -> objects.ObjectPage:
+                             page: int = 0, timeout: float = None) -> objects.ObjectPage:
         """
         Gets the artist's top albums
         :param artist: Artist name
         :param autocorrect: Whether to autocorrect the artist name
         :param limit: Amount of albums to get
         :param page: Page of the search
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "artist.gettopalbums", artist=artist, limit=limit, page=page,
-                                 autocorrect=autocorrect)
-        return objects.ObjectPage(json["topalbums"], objects.Album, "album")
+        json = await self.http.get("artist.gettopalbums", artist=artist, limit=limit, page=page,
+                                   autocorrect=autocorrect, timeout=timeout)
+        return objects.ObjectPage(json["topalbums"], objects.Album, "album", self.pool)
 
-    async def get_top_tags(self, artist: str, *, autocorrect: bool = False) -> objects.ObjectPage:
+    def iter_top_albums(self, artist: str, *, autocorrect: bool = False, limit: int = 50, max_items: int = None,
+                        prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the artist's top albums across every page
+        :param artist: Artist name
+        :param autocorrect: Whether to autocorrect the artist name
+        :param limit: Amount of albums requested per page
+        :param max_items: Stop after this many albums
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Album
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_albums(artist, autocorrect=autocorrect, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
+
+    async def get_top_tags(self, artist: str, *, autocorrect: bool = False,
+                           timeout: float = None) -> objects.ObjectPage:
         """
         Gets the artist's top tags
         :param artist: Artist name
         :param autocorrect: Whether to autocorrect the artist name
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "artist.gettoptags", artist=artist, autocorrect=autocorrect)
-        return objects.ObjectPage(json["toptags"], objects.Tag, "tag")
+        json = await self.http.get("artist.gettoptags", artist=artist, autocorrect=autocorrect, timeout=timeout)
+        return objects.ObjectPage(json["toptags"], objects.Tag, "tag", self.pool)
 
     async def get_top_tracks(self, artist: str, *, autocorrect: bool = False, limit: int = 0,
-                             page: int = 0) -> objects.ObjectPage:
+                             page: int = 0, timeout: float = None) -> objects.ObjectPage:
         """
         Gets the artist's top tracks
         :param artist: Artist name
         :param autocorrect: Whether to autocorrect the artist name
         :param limit: Amount of tracks to get
         :param page: Page of the search
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "artist.gettoptracks", artist=artist, limit=limit, page=page,
-                                 autocorrect=autocorrect)
-        return objects.ObjectPage(json["toptracks"], objects.Track, "track")
+        json = await self.http.get("artist.gettoptracks", artist=artist, limit=limit, page=page,
+                                   autocorrect=autocorrect, timeout=timeout)
+        return objects.ObjectPage(json["toptracks"], objects.Track, "track", self.pool)
 
-    async def search(self, artist: str, *, limit: int = 0, page: int = 0) -> objects.SearchPage:
+    def iter_top_tracks(self, artist: str, *, autocorrect: bool = False, limit: int = 50, max_items: int = None,
+                        prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the artist's top tracks across every page
+        :param artist: Artist name
+        :param autocorrect: Whether to autocorrect the artist name
+        :param limit: Amount of tracks requested per page
+        :param max_items: Stop after this many tracks
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_tracks(artist, autocorrect=autocorrect, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
+
+    async def search(self, artist: str, *, limit: int = 0, page: int = 0, timeout: float = None) -> objects.SearchPage:
         """
         Searches for an artist based off a string
         :param artist: Artist name
         :param limit: Amount of artists to get
         :param page:
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.SearchPage
         """
-        json = await request.get(self.api, "artist.search", artist=artist, limit=limit, page=page)
-        return objects.SearchPage(json["results"], objects.Artist, "artist")
+        json = await self.http.get("artist.search", artist=artist, limit=limit, page=page, timeout=timeout)
+        return objects.SearchPage(json["results"], objects.Artist, "artist", self.pool)
+
+    def iter_search(self, artist: str, *, limit: int = 50, max_items: int = None, prefetch: bool = True,
+                    timeout: float = None):
+        """
+        Iterates over the search results of every page
+        :param artist: Artist name
+        :param limit: Amount of artists requested per page
+        :param max_items: Stop after this many results
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Artist
+        """
+        return pagination.paginate(
+            lambda page: self.search(artist, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
 
 
 class Chart:
-    def __init__(self, api):
+    def __init__(self, api, http: request.HTTPClient = None, pool: objects.InternPool = None):
         self.api = api
+        self.http = http or request.HTTPClient(api)
+        self.pool = pool
 
-    async def get_top_artists(self, *, page: int = 0, limit: int = 0):
+    async def get_top_artists(self, *, page: int = 0, limit: int = 0, timeout: float = None):
         """
         Gets the overall top artists
         :param page: Page of the chart
         :param limit: Amount of artists to get
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "chart.gettopartists", limit=limit, page=page)
-        return objects.ObjectPage(json["artists"], objects.Artist, "artist")
+        json = await self.http.get("chart.gettopartists", limit=limit, page=page, timeout=timeout)
+        return objects.ObjectPage(json["artists"], objects.Artist, "artist", self.pool)
 
-    async def get_top_tags(self, *, page: int = 0, limit: int = 0):
+    def iter_top_artists(self, *, limit: int = 50, max_items: int = None, prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the overall top artists across every page
+        :param limit: Amount of artists requested per page
+        :param max_items: Stop after this many artists
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Artist
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_artists(limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
+
+    async def get_top_tags(self, *, page: int = 0, limit: int = 0, timeout: float = None):
         """
         Gets the overall top tags
         :param page: Page of the chart
         :param limit: Amount of tags to get
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "chart.gettoptags", limit=limit, page=page)
-        return objects.ObjectPage(json["tags"], objects.Tag, "tag")
+        json = await self.http.get("chart.gettoptags", limit=limit, page=page, timeout=timeout)
+        return objects.ObjectPage(json["tags"], objects.Tag, "tag", self.pool)
+
+    def iter_top_tags(self, *, limit: int = 50, max_items: int = None, prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the overall top tags across every page
+        :param limit: Amount of tags requested per page
+        :param max_items: Stop after this many tags
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Tag
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_tags(limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
 
-    async def get_top_tracks(self, *, page: int = 0, limit: int = 0):
+    async def get_top_tracks(self, *, page: int = 0, limit: int = 0, timeout: float = None):
         """
         Gets the overall top tracks
         :param page: Page of the chart
         :param limit: Amount of tracks to get
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "chart.gettoptracks", limit=limit, page=page)
-        return objects.ObjectPage(json["tracks"], objects.Track, "track")
+        json = await self.http.get("chart.gettoptracks", limit=limit, page=page, timeout=timeout)
+        return objects.ObjectPage(json["tracks"], objects.Track, "track", self.pool)
+
+    def iter_top_tracks(self, *, limit: int = 50, max_items: int = None, prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the overall top tracks across every page
+        :param limit: Amount of tracks requested per page
+        :param max_items: Stop after this many tracks
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_tracks(limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
 
 
 class Track:
-    def __init__(self, api):
+    def __init__(self, api, http: request.HTTPClient = None, store: EntityStore = None,
+                 corrections: CorrectionIndex = None, pool: objects.InternPool = None):
         self.api = api
+        self.http = http or request.HTTPClient(api)
+        self.store = store
+        self.corrections = corrections
+        self.pool = pool
 
     async def get_info(self, track: str, artist: str, *, autocorrect: bool = False,
-                       username: str = None) -> objects.Track:
+                       username: str = None, timeout: float = None) -> objects.Track:
         """
         Gets relevant information about a track from a track name
         :param track: Track name
         :param artist: Artist name
         :param autocorrect: Whether the request should autocorrect errors in name
         :param username: The username to fetch relevant information about the album for (amount of plays, etc)
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.Track
         """
-        json = await request.get(self.api, "track.getinfo", track=track, artist=artist, autocorrect=autocorrect,
-                                 username=username)
+        requested = (artist, track)
+        correct = autocorrect and self.corrections is not None
+        if correct:
+            artist, track = self.corrections.resolve("track", requested)
+        stored = self.store is not None and not username
+        if stored:
+            json = self.store.get("track", (artist, track), aliases=autocorrect)
+            if json is not None:
+                return objects.Track(json)
+        json = await self.http.get("track.getinfo", track=track, artist=artist, autocorrect=autocorrect,
+                                   username=username, timeout=timeout)
+        if stored:
+            self.store.set("track", json["track"], (artist, track) if autocorrect else None)
+        if correct:
+            self.corrections.set("track", requested, json["track"])
         return objects.Track(json["track"])
 
-    async def get_correction(self, track: str, artist: str) -> objects.Track:
+    async def get_info_many(self, tracks: list, *, autocorrect: bool = False, username: str = None,
+                            concurrency: int = 8, timeout: float = None) -> list:
         """
-        Gets the correction of an artist name
-        :param track: Track name
-        :param artist: Artist name
-        :return: objects.Track
+        Gets relevant information about many tracks, requesting several at once
+        Tracks that only differ in case or whitespace are requested once
+        :param tracks: list of (track name, artist name) tuples
+        :param autocorrect: Whether the requests should autocorrect errors in name
+        :param username: The username to fetch relevant information about the tracks for (amount of plays, etc)
+        :param concurrency: Maximum amount of requests sent at once
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: list of objects.Track in the order of tracks, with the exception in place of tracks that failed
         """
-        json = await request.get(self.api, "track.getcorrection", track=track, artist=artist)
-        return objects.Track(json["track"])
+        return await batch.gather(lambda track, artist: self.get_info(track, artist, autocorrect=autocorrect,
+                                                                      username=username, timeout=timeout),
+                                  tracks, concurrency=concurrency, key=_normalized)
+
+    def iter_info_many(self, tracks: list, *, autocorrect: bool = False, username: str = None,
+                       concurrency: int = 8, timeout: float = None):
+        """
+        Same as get_info_many but yields ((track name, artist name), result) as each request finishes
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of tuples
+        """
+        return batch.as_completed(lambda track, artist: self.get_info(track, artist, autocorrect=autocorrect,
+                                                                      username=username, timeout=timeout),
+                                  tracks, concurrency=concurrency, key=_normalized)
 
-    async def get_similar(self, track: str, artist: str, *, autocorrect: bool = False, limit: int = 0) -> list:
+    async def get_correction(self, track: str, artist: str, *, timeout: float = None) -> objects.Track:
+        """
+        Gets the correction of a track and artist name
+        Without a request if the CorrectionIndex already knows the names
+        :param track: Track name
+        :param artist: Artist name
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
+        :return: objects.Track, None if last.fm has no correction
+        """
+        if self.corrections is not None:
+            found = self.corrections.get("track", (artist, track))
+            if found is not None:
+                return objects.Track({"name": found.names[1], "mbid": found.mbid, "url": found.url,
+                                      "artist": {"name": found.names[0]}})
+        json = await self.http.get("track.getcorrection", track=track, artist=artist, timeout=timeout)
+        corrected = correction(json, "track")
+        if corrected is None:
+            return None
+        if self.corrections is not None:
+            self.corrections.set("track", (artist, track), corrected)
+        return objects.Track(corrected)
+
+    async def get_similar(self, track: str, artist: str, *, autocorrect: bool = False, limit: int = 0,
+                          timeout: float = None) -> list:
         """
         Gets similar tracks from a track name
         :param track: Track name
         :param artist: Artist name
         :param autocorrect: Whether the request should autocorrect errors in name
         :param limit: The amount of similar tracks to get
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: list of objects.Track
         """
-        json = await request.get(self.api, "track.getsimilar", track=track, artist=artist, limit=limit,
-                                 autocorrect=autocorrect)
+        json = await self.http.get("track.getsimilar", track=track, artist=artist, limit=limit,
+                                   autocorrect=autocorrect, timeout=timeout)
         return [objects.Track(track) for track in json["similartracks"]["track"]]
 
-    async def get_top_tags(self, track: str, artist: str, *, autocorrect: bool = False) -> list:
+    async def get_top_tags(self, track: str, artist: str, *, autocorrect: bool = False, timeout: float = None) -> list:
         """
         Gets top tags of a track
         :param track: Track name
         :param artist: Artist name
         :param autocorrect: Whether the request should autocorrect errors in name
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: list of objects.Tag
         """
-        json = await request.get(self.api, "track.gettoptags", track=track, autocorrect=autocorrect)
+        json = await self.http.get("track.gettoptags", track=track, autocorrect=autocorrect, timeout=timeout)
         return [objects.Tag(tag) for tag in json["toptags"]["tag"]]
 
-    async def search(self, track: str, *, limit: int = 0, page: int = 0) -> objects.SearchPage:
+    async def search(self, track: str, *, limit: int = 0, page: int = 0, timeout: float = None) -> objects.SearchPage:
         """
         Searches for a track based on a string
         :param track: Track to search for
         :param limit: Amount of tracks to get
         :param page: Page of the search
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.SearchPage
         """
-        json = await request.get(self.api, "track.search", track=track, limit=limit, page=page)
-        return objects.SearchPage(json["results"], objects.Track, "track")
+        json = await self.http.get("track.search", track=track, limit=limit, page=page, timeout=timeout)
+        return objects.SearchPage(json["results"], objects.Track, "track", self.pool)
+
+    def iter_search(self, track: str, *, limit: int = 50, max_items: int = None, prefetch: bool = True,
+                    timeout: float = None):
+        """
+        Iterates over the search results of every page
+        :param track: Track to search for
+        :param limit: Amount of tracks requested per page
+        :param max_items: Stop after this many results
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        return pagination.paginate(
+            lambda page: self.search(track, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
 
 
 class User:
-    def __init__(self, api):
+    def __init__(self, api, http: request.HTTPClient = None, pool: objects.InternPool = None):
         self.api = api
+        self.http = http or request.HTTPClient(api)
+        self.pool = pool
 
-    async def get_info(self, user: str) -> objects.User:
+    async def get_info(self, user: str, *, timeout: float = None) -> objects.User:
         """
         Gets relevant information about a user based on a username
         :param user: Username of a user
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.User
         """
-        json = await request.get(self.api, "user.getinfo", user=user)
+        json = await self.http.get("user.getinfo", user=user, timeout=timeout)
         return objects.User(json["user"])
 
     async def get_friends(self, user: str, *, recenttracks: bool = False, limit: int = 0,
-                          page: int = 0) -> objects.ObjectPage:
+                          page: int = 0, timeout: float = None) -> objects.ObjectPage:
         """
         Gets friends of a user
         :param user: Username of a user
         :param recenttracks: Whether to get the recent tracks of the user's friends
         :param limit: The amount of friends to get
         :param page: The page of friends
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "user.getfriends", user=user, recenttracks=recenttracks, limit=limit,
-                                 page=page)
-        return objects.ObjectPage(json["friends"], objects.User, "user")
+        json = await self.http.get("user.getfriends", user=user, recenttracks=recenttracks, limit=limit,
+                                   page=page, timeout=timeout)
+        return objects.ObjectPage(json["friends"], objects.User, "user", self.pool)
+
+    def iter_friends(self, user: str, *, recenttracks: bool = False, limit: int = 50, max_items: int = None,
+                     prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the friends of a user across every page
+        :param user: Username of a user
+        :param recenttracks: Whether to get the recent tracks of the user's friends
+        :param limit: The amount of friends requested per page
+        :param max_items: Stop after this many friends
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.User
+        """
+        return pagination.paginate(
+            lambda page: self.get_friends(user, recenttracks=recenttracks, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
 
-    async def get_loved_tracks(self, user: str, *, limit: int = 0, page: int = 0) -> objects.ObjectPage:
+    async def get_loved_tracks(self, user: str, *, limit: int = 0, page: int = 0,
+                               timeout: float = None) -> objects.ObjectPage:
         """
         Gets the loved tracks of a user
         :param user: Username of a user
         :param limit: The amount of loved tracks to get
         :param page: The page of loved tracks
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "user.getlovedtracks", user=user, limit=limit, page=page)
-        return objects.ObjectPage(json["lovedtracks"], objects.Track, "track")
+        json = await self.http.get("user.getlovedtracks", user=user, limit=limit, page=page, timeout=timeout)
+        return objects.ObjectPage(json["lovedtracks"], objects.Track, "track", self.pool)
+
+    def iter_loved_tracks(self, user: str, *, limit: int = 50, max_items: int = None, prefetch: bool = True,
+                          timeout: float = None):
+        """
+        Iterates over the loved tracks of a user across every page
+        :param user: Username of a user
+        :param limit: The amount of loved tracks requested per page
+        :param max_items: Stop after this many tracks
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        return pagination.paginate(
+            lambda page: self.get_loved_tracks(user, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
 
     async def get_recent_tracks(self, user: str, *, limit: int = 0, page: int = 0, from_: int = 0,
-                                extended: bool = False, to: int = 0) -> objects.ObjectPage:
+                                extended: bool = False, to: int = 0, columnar: bool = False,
+                                timeout: float = None) -> objects.ObjectPage:
         """
         Get recent tracks of a user
         :param user: Username of a user
@@ -330,49 +726,228 @@ class User:
         :param from_: UNIX timestamp of beginning of timespan
         :param extended: Whether to get extended track information
         :param to: UNIX timestamp of end of timespan
+        :param columnar: Whether to return a columnar.ColumnPage instead of objects
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return: objects.ObjectPage
         """
-        json = await request.get(self.api, "user.getrecenttracks", user=user, limit=limit, page=page, from_=from_,
-                                 extended=extended, to=to)
-        return objects.ObjectPage(json["recenttracks"], objects.Track, "track")
+        json = await self.http.get("user.getrecenttracks", user=user, limit=limit, page=page, from_=from_,
+                                   extended=extended, to=to, timeout=timeout)
+        return _page(json["recenttracks"], objects.Track, "track", columnar, self.pool)
 
-    async def get_top_albums(self, user: str, *, period: str = None, limit: int = 0, page: int = 0):
-        json = await request.get(self.api, "user.gettopalbums", user=user, limit=limit, page=page, period=period)
-        return objects.ObjectPage(json["topalbums"], objects.Album, "album")
+    def iter_recent_tracks(self, user: str, *, limit: int = 200, from_: int = 0, extended: bool = False, to: int = 0,
+                           max_items: int = None, now_playing: bool = False, prefetch: bool = True,
+                           timeout: float = None):
+        """
+        Iterates over the recent tracks of a user across every page, newest first
+        :param user: Username of a user
+        :param limit: Amount of recent tracks requested per page (200 at most)
+        :param from_: UNIX timestamp of beginning of timespan
+        :param extended: Whether to get extended track information
+        :param to: UNIX timestamp of end of timespan, defaults to now so that new scrobbles do not shift the pages
+        :param max_items: Stop after this many tracks
+        :param now_playing: Whether to also yield the currently playing track
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        to = to or int(time.time())
+        return pagination.paginate(
+            lambda page: self.get_recent_tracks(user, limit=limit, page=page, from_=from_, extended=extended, to=to,
+                                                timeout=timeout),
+            max_items=max_items, prefetch=prefetch, skip=None if now_playing else _is_now_playing)
+
+    def export_recent_tracks(self, user: str, *, limit: int = 200, from_: int = 0, extended: bool = False,
+                             to: int = 0, concurrency: int = 4, retries: int = None, timeout: float = None):
+        """
+        Iterates over the whole scrobble history of a user, newest first, requesting several pages at once
+        The end of the timespan is pinned to the current time so that new scrobbles do not shift the pages
+        :param user: Username of a user
+        :param limit: Amount of recent tracks requested per page (200 at most)
+        :param from_: UNIX timestamp of beginning of timespan
+        :param extended: Whether to get extended track information
+        :param to: UNIX timestamp of end of timespan, defaults to now
+        :param concurrency: Maximum amount of pages being requested at once
+        :param retries: Times a page is requested again on top of the retries of the client, 0 if it retries by default
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        to = to or int(time.time())
+        if retries is None:
+            retries = 0 if self.http.retry is not None else 3
+        return pagination.fetch_all(
+            lambda page: self.get_recent_tracks(user, limit=limit, page=page, from_=from_, extended=extended, to=to,
+                                                timeout=timeout),
+            concurrency=concurrency, retries=retries, skip=_is_now_playing, key=_scrobble_key)
+
+    async def stream_recent_tracks(self, user: str, *, limit: int = 1000, page: int = 0, from_: int = 0,
+                                   extended: bool = False, to: int = 0, timeout: float = None):
+        """
+        Same as get_recent_tracks but yields the tracks while the response is still being parsed
+        Useful for large pages, see request.HTTPClient.stream
+        :param user: Username of a user
+        :param limit: Amount of recent tracks to get
+        :param page: Page of recent tracks to get
+        :param from_: UNIX timestamp of beginning of timespan
+        :param extended: Whether to get extended track information
+        :param to: UNIX timestamp of end of timespan
+        :param timeout: Seconds to wait for the whole response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        async for track in self.http.stream("user.getrecenttracks", "recenttracks.track.item", user=user, limit=limit,
+                                            page=page, from_=from_, extended=extended, to=to, timeout=timeout):
+            yield objects.Track(track) if self.pool is None else self.pool.track(track)
 
-    async def get_top_artists(self, user: str, *, period: str = None, limit: int = 0, page: int = 0):
-        json = await request.get(self.api, "user.gettopartists", user=user, limit=limit, page=page, period=period)
-        return objects.ObjectPage(json["topartists"], objects.Artist, "artist")
+    async def get_history(self, user: str, *, limit: int = 200, from_: int = 0, to: int = 0, concurrency: int = 4,
+                          timeout: float = None) -> columnar.ColumnPage:
+        """
+        Downloads the whole scrobble history of a user into one columnar.ColumnPage, requesting several pages at once
+        The end of the timespan is pinned to the current time so that new scrobbles do not shift the pages
+        :param user: Username of a user
+        :param limit: Amount of recent tracks requested per page (200 at most)
+        :param from_: UNIX timestamp of beginning of timespan
+        :param to: UNIX timestamp of end of timespan, defaults to now
+        :param concurrency: Maximum amount of pages being requested at once
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: columnar.ColumnPage, newest first, the now playing track is marked in playing
+        """
+        to = to or int(time.time())
 
-    async def get_top_tags(self, user: str, *, limit: int = 0):
-        json = await request.get(self.api, "user.gettoptags", user=user, limit=limit)
-        return objects.ObjectPage(json["toptags"], objects.Tag, "tag")
+        async def fetch(page):
+            return await self.get_recent_tracks(user, limit=limit, page=page, from_=from_, to=to, columnar=True,
+                                                timeout=timeout)
 
-    async def get_top_tracks(self, user: str, *, period: str = None, limit: int = 0, page: int = 0):
-        json = await request.get(self.api, "user.gettoptracks", user=user, limit=limit, page=page, period=period)
-        return objects.ObjectPage(json["toptracks"], objects.Track, "track")
+        first = await fetch(1)
+        pages = await batch.gather(fetch, [(page,) for page in range(2, int(first.pages or 0) + 1)],
+                                   concurrency=concurrency)
+        for page in pages:
+            if isinstance(page, Exception):
+                raise page
+        return columnar.ColumnPage.concat([first] + pages)
 
-    async def get_weekly_album_chart(self, user: str, *, from_: str = None, to: str = None):
-        json = await request.get(self.api, "user.getweeklyalbumchart", user=user, from_=from_, to=to)
-        return objects.ObjectPage(json["weeklyalbumchart"], objects.Album, "album")
+    async def get_listening_stats(self, user: str, *, from_: int = 0, to: int = 0, utc_offset: int = 0,
+                                  concurrency: int = 4, timeout: float = None) -> stats.ListeningStats:
+        """
+        Downloads the scrobble history of a user with get_history and indexes it for statistics queries
+        :param user: Username of a user
+        :param from_: UNIX timestamp of beginning of timespan
+        :param to: UNIX timestamp of end of timespan, defaults to now
+        :param utc_offset: Seconds added to the timestamps before hours, weekdays and days are worked out
+        :param concurrency: Maximum amount of pages being requested at once
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: stats.ListeningStats
+        """
+        history = await self.get_history(user, from_=from_, to=to, concurrency=concurrency, timeout=timeout)
+        return stats.ListeningStats(history, utc_offset=utc_offset)
 
-    async def get_weekly_artist_chart(self, user: str, *, from_: str = None, to: str = None):
-        json = await request.get(self.api, "user.getweeklyartistchart", user=user, from_=from_, to=to)
-        return objects.ObjectPage(json["weeklyartistchart"], objects.Artist, "artist")
+    async def get_top_albums(self, user: str, *, period: str = None, limit: int = 0, page: int = 0,
+                             columnar: bool = False, timeout: float = None):
+        json = await self.http.get("user.gettopalbums", user=user, limit=limit, page=page, period=period,
+                                   timeout=timeout)
+        return _page(json["topalbums"], objects.Album, "album", columnar, self.pool)
 
-    async def get_weekly_track_chart(self, user: str, *, from_: str = None, to: str = None):
-        json = await request.get(self.api, "user.getweeklytrackchart", user=user, from_=from_, to=to)
-        return objects.ObjectPage(json["weeklytrackchart"], objects.Track, "track")
+    def iter_top_albums(self, user: str, *, period: str = None, limit: int = 50, max_items: int = None,
+                        prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the top albums of a user across every page
+        :param user: Username of a user
+        :param period: overall, 7day, 1month, 3month, 6month or 12month
+        :param limit: Amount of albums requested per page
+        :param max_items: Stop after this many albums
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Album
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_albums(user, period=period, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
+
+    async def get_top_artists(self, user: str, *, period: str = None, limit: int = 0, page: int = 0,
+                              columnar: bool = False, timeout: float = None):
+        json = await self.http.get("user.gettopartists", user=user, limit=limit, page=page, period=period,
+                                   timeout=timeout)
+        return _page(json["topartists"], objects.Artist, "artist", columnar, self.pool)
+
+    def iter_top_artists(self, user: str, *, period: str = None, limit: int = 50, max_items: int = None,
+                         prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the top artists of a user across every page
+        :param user: Username of a user
+        :param period: overall, 7day, 1month, 3month, 6month or 12month
+        :param limit: Amount of artists requested per page
+        :param max_items: Stop after this many artists
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Artist
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_artists(user, period=period, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
+
+    async def get_top_tags(self, user: str, *, limit: int = 0, timeout: float = None):
+        json = await self.http.get("user.gettoptags", user=user, limit=limit, timeout=timeout)
+        return objects.ObjectPage(json["toptags"], objects.Tag, "tag", self.pool)
+
+    async def get_top_tracks(self, user: str, *, period: str = None, limit: int = 0, page: int = 0,
+                             columnar: bool = False, timeout: float = None):
+        json = await self.http.get("user.gettoptracks", user=user, limit=limit, page=page, period=period,
+                                   timeout=timeout)
+        return _page(json["toptracks"], objects.Track, "track", columnar, self.pool)
+
+    def iter_top_tracks(self, user: str, *, period: str = None, limit: int = 50, max_items: int = None,
+                        prefetch: bool = True, timeout: float = None):
+        """
+        Iterates over the top tracks of a user across every page
+        :param user: Username of a user
+        :param period: overall, 7day, 1month, 3month, 6month or 12month
+        :param limit: Amount of tracks requested per page
+        :param max_items: Stop after this many tracks
+        :param prefetch: Whether to request the next page while the current one is being consumed
+        :param timeout: Seconds to wait for each response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        return pagination.paginate(
+            lambda page: self.get_top_tracks(user, period=period, limit=limit, page=page, timeout=timeout),
+            max_items=max_items, prefetch=prefetch)
+
+    async def get_weekly_album_chart(self, user: str, *, from_: str = None, to: str = None, columnar: bool = False,
+                                     timeout: float = None):
+        json = await self.http.get("user.getweeklyalbumchart", user=user, from_=from_, to=to, timeout=timeout)
+        return _page(json["weeklyalbumchart"], objects.Album, "album", columnar, self.pool)
+
+    async def get_weekly_artist_chart(self, user: str, *, from_: str = None, to: str = None, columnar: bool = False,
+                                     timeout: float = None):
+        json = await self.http.get("user.getweeklyartistchart", user=user, from_=from_, to=to, timeout=timeout)
+        return _page(json["weeklyartistchart"], objects.Artist, "artist", columnar, self.pool)
+
+    async def get_weekly_track_chart(self, user: str, *, from_: str = None, to: str = None, columnar: bool = False,
+                                     timeout: float = None):
+        json = await self.http.get("user.getweeklytrackchart", user=user, from_=from_, to=to, timeout=timeout)
+        return _page(json["weeklytrackchart"], objects.Track, "track", columnar, self.pool)
+
+    async def stream_weekly_track_chart(self, user: str, *, from_: str = None, to: str = None,
+                                        timeout: float = None):
+        """
+        Same as get_weekly_track_chart but yields the tracks while the response is still being parsed
+        :param user: Username of a user
+        :param from_: UNIX timestamp of beginning of the chart
+        :param to: UNIX timestamp of end of the chart
+        :param timeout: Seconds to wait for the whole response before raising asyncio.TimeoutError
+        :return: async iterator of objects.Track
+        """
+        async for track in self.http.stream("user.getweeklytrackchart", "weeklytrackchart.track.item", user=user,
+                                            from_=from_, to=to, timeout=timeout):
+            yield objects.Track(track) if self.pool is None else self.pool.track(track)
 
-    async def get_now_playing(self, user):
+    async def get_now_playing(self, user, *, timeout: float = None):
         """
         Runs get_recent_tracks and returns the first track if the now_playing attribute is true
         :param user:
+        :param timeout: Seconds to wait for the response before raising asyncio.TimeoutError
         :return:
         """
         # NOT AN API METHOD
         # this is kind of a utility function so you don't have to do this yourself
-        recent = await self.get_recent_tracks(user=user)
+        recent = await self.get_recent_tracks(user=user, timeout=timeout)
         try:
             now = recent.items[0]
         except IndexError:
@@ -0,0 +1,139 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import sys
+from typing import Dict, List
+
+from . import utils
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+STRINGS = ("name", "artist", "album")
+NUMBERS = ("uts", "playcount", "rank")
+
+
+def _encode(values: list):
+    codes, categories, indexes = [], [], {}
+    for value in values:
+        code = indexes.get(value)
+        if code is None:
+            code = indexes[value] = len(categories)
+            categories.append(sys.intern(value))
+        codes.append(code)
+    return numpy.array(codes, dtype=numpy.int32), categories
+
+
+class ColumnPage:
+    """
+    A page of tracks, albums or artists stored as columns instead of objects
+    name, artist and album are dictionary-encoded: codes[column] holds int32 indexes into categories[column]
+    uts, playcount and rank are int64 arrays, playing is a bool array (True for the now playing track)
+    Values missing from the response are 0 or the empty string
+    """
+
+    def __init__(self, json: dict, string: str):
+        if numpy is None:
+            raise ImportError("numpy is required for columnar results, install lastfmpy[numpy]")
+        items = json.get(string) or []
+        self.page: int = json.get("@attr", {}).get("page")
+        self.per_page: int = json.get("@attr", {}).get("perPage")
+        self.pages: int = json.get("@attr", {}).get("totalPages")
+        self.total: int = json.get("@attr", {}).get("total")
+        self.codes: Dict[str, "numpy.ndarray"] = {}
+        self.categories: Dict[str, List[str]] = {}
+        for column in STRINGS:
+            self.codes[column], self.categories[column] = _encode([utils.text(item.get(column)) for item in items])
+        self.uts = numpy.array([int(item.get("date", {}).get("uts", 0)) for item in items], dtype=numpy.int64)
+        self.playcount = numpy.array([int(item.get("playcount", 0)) for item in items], dtype=numpy.int64)
+        self.rank = numpy.array([int(item.get("@attr", {}).get("rank", 0)) for item in items], dtype=numpy.int64)
+        self.playing = numpy.array([item.get("@attr", {}).get("nowplaying") == "true" for item in items],
+                                   dtype=bool)
+
+    def __len__(self):
+        return len(self.uts)
+
+    def decode(self, column: str) -> List[str]:
+        """
+        :param column: name, artist or album
+        :return: list of the values of a string column
+        """
+        categories = self.categories[column]
+        return [categories[code] for code in self.codes[column]]
+
+    def to_dict(self) -> dict:
+        """
+        :return: dict of column name to numpy array, string columns are decoded into object arrays
+        """
+        columns = {}
+        for column in STRINGS:
+            categories = numpy.empty(len(self.categories[column]), dtype=object)
+            categories[:] = self.categories[column]
+            columns[column] = categories[self.codes[column]]
+        columns.update({column: getattr(self, column) for column in NUMBERS})
+        columns["playing"] = self.playing
+        return columns
+
+    def to_arrow(self) -> "pyarrow.Table":
+        """
+        :return: pyarrow.Table with dictionary-encoded string columns, ready for pyarrow.parquet.write_table
+        """
+        if pyarrow is None:
+            raise ImportError("pyarrow is required for Arrow export, install lastfmpy[arrow]")
+        columns = {column: pyarrow.DictionaryArray.from_arrays(self.codes[column],
+                                                               pyarrow.array(self.categories[column], pyarrow.string()))
+                   for column in STRINGS}
+        columns.update({column: pyarrow.array(getattr(self, column)) for column in NUMBERS})
+        columns["playing"] = pyarrow.array(self.playing)
+        return pyarrow.table(columns)
+
+    @classmethod
+    def concat(cls, pages: List["ColumnPage"]) -> "ColumnPage":
+        """
+        Joins several pages, for example every page of a scrobble history, into one
+        :param pages: list of ColumnPage
+        :return: ColumnPage without page information
+        """
+        joined = cls({}, "")
+        for column in STRINGS:
+            indexes = {}
+            remapped = []
+            for page in pages:
+                mapping = numpy.empty(len(page.categories[column]), dtype=numpy.int32)
+                for code, value in enumerate(page.categories[column]):
+                    mapping[code] = indexes.setdefault(value, len(indexes))
+                remapped.append(mapping[page.codes[column]])
+            joined.codes[column] = numpy.concatenate(remapped) if remapped else joined.codes[column]
+            joined.categories[column] = list(indexes)
+        for column in NUMBERS + ("playing",):
+            if pages:
+                setattr(joined, column, numpy.concatenate([getattr(page, column) for page in pages]))
+        return joined
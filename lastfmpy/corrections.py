@@ -0,0 +1,128 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import sqlite3
+from typing import NamedTuple, Optional
+
+from . import utils
+
+
+class Correction(NamedTuple):
+    names: tuple  # (artist,), (artist, album) or (artist, track) as last.fm spells them
+    mbid: str
+    url: str
+
+
+def correction(json_: dict, kind: str) -> Optional[dict]:
+    """
+    :param json_: Response of artist.getcorrection or track.getcorrection
+    :param kind: artist or track
+    :return: The corrected artist or track object, None if last.fm has no correction
+    """
+    corrections = json_.get("corrections")
+    if isinstance(corrections, dict):
+        found = corrections.get("correction")
+        if isinstance(found, list):  # several corrections, the first is the one last.fm uses for autocorrect
+            found = found[0] if found else None
+        return found.get(kind) if isinstance(found, dict) else None
+    return json_.get(kind)
+
+
+class CorrectionIndex:
+    """
+    Remembers which names last.fm corrects which names to, so that a name is only ever sent to be corrected once
+    Names are compared normalized (see utils.normalize), so names that only differ in case, whitespace or unicode form
+    share an entry; names that are already correct are recorded as well
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: SQLite file the index is kept in across restarts, None to keep it in memory only
+        """
+        self.path = path
+        self._entries = {}  # (kind, names key) -> Correction
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS corrections (kind TEXT, key TEXT, names TEXT, mbid TEXT, url TEXT, "
+                "PRIMARY KEY (kind, key))")
+            for kind, key, names, mbid, url in self._connection.execute("SELECT * FROM corrections"):
+                self._entries[kind, key] = Correction(tuple(json.loads(names)), mbid, url)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, names: tuple) -> Optional[Correction]:
+        """
+        :param kind: artist, album or track
+        :param names: (artist,), (artist, album) or (artist, track) as they were asked for
+        :return: Correction if the names were seen before, None otherwise
+        """
+        found = self._entries.get((kind, utils.names_key(names)))
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def resolve(self, kind: str, names: tuple) -> tuple:
+        """
+        :return: The corrected names if they are known, names otherwise
+        """
+        found = self.get(kind, names)
+        return found.names if found is not None else names
+
+    def set(self, kind: str, names: tuple, corrected: dict):
+        """
+        Records the artist, album or track object that last.fm returned for names
+        The corrected names are recorded as well, they correct to themselves
+        :param kind: artist, album or track
+        :param names: (artist,), (artist, album) or (artist, track) as they were asked for
+        :param corrected: Artist, album or track object of a getcorrection or getinfo response
+        """
+        canonical = utils.entity_names(kind, corrected)
+        if not all(canonical):
+            return
+        found = Correction(canonical, corrected.get("mbid") or "", corrected.get("url") or "")
+        keys = {utils.names_key(names), utils.names_key(canonical)}
+        changed = [key for key in keys if self._entries.get((kind, key)) != found]
+        for key in changed:
+            self._entries[kind, key] = found
+        if self._connection is not None and changed:
+            self._connection.executemany("INSERT OR REPLACE INTO corrections VALUES (?, ?, ?, ?, ?)",
+                                         [(kind, key, json.dumps(canonical), found.mbid, found.url) for key in changed])
+
+    def clear(self):
+        self._entries.clear()
+        if self._connection is not None:
+            self._connection.execute("DELETE FROM corrections")
+        self.hits = self.misses = 0
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+    def __len__(self):
+        return len(self._entries)
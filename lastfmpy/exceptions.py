@@ -28,6 +28,7 @@ class InvalidInputError(Exception):
     API error code 6
     The exception raised when a request to the API resulted in nothing being found
     """
+    code = 6
 
     def __init__(self, message):
         self.message = message
@@ -41,6 +42,7 @@ class OperationFailedError(Exception):
     API error code 8
     The exception raised when "Something else went wrong"
     """
+    code = 8
 
     def __init__(self, message):
         self.message = message
@@ -54,6 +56,7 @@ class ServiceOfflineError(Exception):
     API error code 11
     The exception raised when a request to the API errored because the service was offline
     """
+    code = 11
 
     def __init__(self, message):
         self.message = message
@@ -67,6 +70,7 @@ class TemporaryError(Exception):
     API error code 16
     The exception raised when a request to the API errored because the service was temporarily unavailable
     """
+    code = 16
 
     def __init__(self, message):
         self.message = message
@@ -81,6 +85,8 @@ class APIKeySuspendedError(Exception):
     The exception when an API key has been suspended
     Contact Last.FM to resolve
     """
+    code = 26
+
     def __init__(self, message):
         self.message = message
 
@@ -93,6 +99,33 @@ class RatelimitExceededError(Exception):
     API error code 29
     The exception raised when an IP has made too many requests in a short period
     """
+    code = 29
+
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class HTTPError(Exception):
+    """
+    The exception raised when the API responded with an HTTP error status and no last.fm error code
+    For example a 502 from the load balancer in front of the API
+    """
+    def __init__(self, status: int, message: str):
+        self.status = status
+        self.message = message
+
+    def __str__(self):
+        return f"{self.status} {self.message}"
+
+
+class CircuitOpenError(Exception):
+    """
+    The exception raised instead of sending a request while the circuit breaker is open
+    because too many recent requests failed
+    """
     def __init__(self, message):
         self.message = message
 
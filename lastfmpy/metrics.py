@@ -0,0 +1,168 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import bisect
+from collections import defaultdict
+from typing import Callable, NamedTuple, Optional, Union
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+
+
+class RequestEvent(NamedTuple):
+    """
+    Passed to hooks after every request that was sent, retries included
+    """
+    method: str
+    status: Optional[int]  # HTTP status, None if no response arrived
+    error: Optional[str]  # name of the exception raised, None if the request succeeded
+    code: Optional[int]  # last.fm error code of the exception raised, if it has one
+    size: int  # bytes in the response body
+    latency: float  # seconds from sending the request to having read the whole body
+    decode_time: float  # seconds spent decoding the body
+    ratelimit_wait: float  # seconds spent waiting for the rate limiter before sending
+
+
+class CacheEvent(NamedTuple):
+    """
+    Passed to hooks after every cache lookup
+    """
+    method: str
+    result: str  # HIT, STALE or MISS
+
+
+Event = Union[RequestEvent, CacheEvent]
+Hook = Callable[[Event], None]
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        :return: Upper bound of the bucket the q quantile falls in (inf if it is above the last bucket)
+        """
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+
+class Metrics:
+    """
+    Hook that keeps per-method counters and latency histograms in memory
+    """
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)  # (method, error name) -> count
+        self.bytes = defaultdict(int)
+        self.latency = defaultdict(Histogram)
+        self.decode_time = defaultdict(Histogram)
+        self.ratelimit_wait = defaultdict(float)
+        self.cache = defaultdict(int)  # (method, result) -> count
+
+    def __call__(self, event: Event):
+        if isinstance(event, CacheEvent):
+            self.cache[event.method, event.result] += 1
+            return
+        self.requests[event.method] += 1
+        if event.error is not None:
+            self.errors[event.method, event.error] += 1
+        self.bytes[event.method] += event.size
+        self.latency[event.method].observe(event.latency)
+        self.decode_time[event.method].observe(event.decode_time)
+        self.ratelimit_wait[event.method] += event.ratelimit_wait
+
+    def summary(self) -> dict:
+        """
+        :return: dict of method to its counters, sorted by amount of requests
+        """
+        methods = sorted(self.requests, key=self.requests.get, reverse=True)
+        return {method: {
+            "requests": self.requests[method],
+            "errors": sum(count for (errored, _), count in self.errors.items() if errored == method),
+            "bytes": self.bytes[method],
+            "latency_p50": self.latency[method].quantile(0.5),
+            "latency_p99": self.latency[method].quantile(0.99),
+            "decode_time": self.decode_time[method].sum,
+            "ratelimit_wait": self.ratelimit_wait[method],
+            "cache_hits": self.cache.get((method, HIT), 0) + self.cache.get((method, STALE), 0),
+        } for method in methods}
+
+
+class PrometheusMetrics:
+    """
+    Hook that records events as prometheus_client counters and histograms labelled by method
+    """
+
+    def __init__(self, registry=None, *, namespace: str = "lastfmpy"):
+        if prometheus_client is None:
+            raise ImportError("prometheus_client is required for PrometheusMetrics, install lastfmpy[prometheus]")
+        registry = registry if registry is not None else prometheus_client.REGISTRY
+        options = {"namespace": namespace, "registry": registry}
+        self.requests = prometheus_client.Counter("requests", "Requests sent", ["method", "status"], **options)
+        self.errors = prometheus_client.Counter("errors", "Requests that failed", ["method", "error", "code"],
+                                                **options)
+        self.bytes = prometheus_client.Counter("response_bytes", "Bytes received", ["method"], **options)
+        self.latency = prometheus_client.Histogram("request_seconds", "Request latency", ["method"],
+                                                   buckets=BUCKETS, **options)
+        self.decode_time = prometheus_client.Histogram("decode_seconds", "Time spent decoding responses", ["method"],
+                                                       buckets=BUCKETS, **options)
+        self.ratelimit_wait = prometheus_client.Counter("ratelimit_wait_seconds", "Time spent waiting for the rate "
+                                                        "limiter", ["method"], **options)
+        self.cache = prometheus_client.Counter("cache_lookups", "Cache lookups", ["method", "result"], **options)
+
+    def __call__(self, event: Event):
+        if isinstance(event, CacheEvent):
+            self.cache.labels(event.method, event.result).inc()
+            return
+        self.requests.labels(event.method, str(event.status)).inc()
+        if event.error is not None:
+            self.errors.labels(event.method, event.error, str(event.code or "")).inc()
+        self.bytes.labels(event.method).inc(event.size)
+        self.latency.labels(event.method).observe(event.latency)
+        self.decode_time.labels(event.method).observe(event.decode_time)
+        self.ratelimit_wait.labels(event.method).inc(event.ratelimit_wait)
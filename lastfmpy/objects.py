@@ -22,61 +22,201 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import sys
 from datetime import datetime
 
 
+class _lazy:
+    """
+    Attribute computed from the raw JSON of an object the first time it is accessed
+    The value is kept in the slot of the same name prefixed with an underscore
+    """
+
+    __slots__ = ("function", "slot")
+
+    def __init__(self, function):
+        self.function = function
+        self.slot = "_" + function.__name__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.slot)
+        except AttributeError:
+            value = self.function(instance)
+            setattr(instance, self.slot, value)
+            return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value)
+
+
+def _timestamp(value) -> datetime:
+    return datetime.utcfromtimestamp(int(value or 0))
+
+
 class Album:
+    __slots__ = ("json", "_name", "_artist", "_image", "_stats", "_toptags", "_tracks", "_wiki")
+
     def __init__(self, json: dict):
-        self.name = json.get("name") or json.get("#text")
-        self.artist = Artist(json.get("artist")) if isinstance(json.get("artist"), dict) else json.get("artist")
-        self.releasedate = json.get("releasedate")  # TODO: figure out the format of this and make it a datetime object
-        self.image = [Image(image) for image in json.get("image", {})]
-        self.stats = Stats(json)
-        self.toptags = [Tag(tag) for tag in json.get("tags", {}).get("tag", {})]
-        self.tracks = [Track(track) for track in json.get("tracks", {}).get("track", {})]
-        self.wiki = Info(json.get("wiki", {}))
-        self.url = json.get("url")
-        self.mbid = json.get("mbid")
+        self.json = json
+
+    @_lazy
+    def name(self) -> str:
+        return self.json.get("name") or self.json.get("#text")
+
+    @_lazy
+    def artist(self):
+        artist = self.json.get("artist")
+        return Artist(artist) if isinstance(artist, dict) else artist
+
+    @property
+    def releasedate(self):
+        return self.json.get("releasedate")  # TODO: figure out the format of this and make it a datetime object
+
+    @_lazy
+    def image(self) -> list:
+        return [Image(image) for image in self.json.get("image", {})]
+
+    @_lazy
+    def stats(self):
+        return Stats(self.json)
+
+    @_lazy
+    def toptags(self) -> list:
+        return [Tag(tag) for tag in self.json.get("tags", {}).get("tag", {})]
+
+    @_lazy
+    def tracks(self) -> list:
+        return [Track(track) for track in self.json.get("tracks", {}).get("track", {})]
+
+    @_lazy
+    def wiki(self):
+        return Info(self.json.get("wiki", {}))
+
+    @property
+    def url(self) -> str:
+        return self.json.get("url")
+
+    @property
+    def mbid(self) -> str:
+        return self.json.get("mbid")
 
     def __str__(self):
         return self.name
 
 
 class Track:
+    __slots__ = ("json", "_name", "_artist", "_album", "_image", "_stats", "_toptags", "_playing", "_played")
+
     def __init__(self, json: dict):
-        self.name: str = json.get("name")
-        self.artist = Artist(json.get("artist")) if isinstance(json.get("artist"), dict) else json.get("artist")
-        self.album = Album(json.get("album", {}))
-        self.duration: int = json.get("duration")
-        self.releasedate: str = json.get("release_date")  # see above
-        self.image: list = [Image(image) for image in json.get("image", {})]
-        self.stats: Stats = Stats(json)
-        self.toptags: list = [Tag(tag) for tag in json.get("tags", {}).get("tag", {})]
-        self.playing = self.now_playing = True if json.get("@attr", {}).get("nowplaying") == "true" else False
-        self.played = datetime.utcfromtimestamp(int(json.get("date", {}).get("uts", 0)))
-        self.url: str = json.get("url")
-        self.mbid = json.get("mbid")
+        self.json = json
+
+    @_lazy
+    def name(self) -> str:
+        return self.json.get("name")
+
+    @_lazy
+    def artist(self):
+        artist = self.json.get("artist")
+        return Artist(artist) if isinstance(artist, dict) else artist
+
+    @_lazy
+    def album(self):
+        return Album(self.json.get("album", {}))
+
+    @property
+    def duration(self) -> int:
+        return self.json.get("duration")
+
+    @property
+    def releasedate(self) -> str:
+        return self.json.get("release_date")  # see above
+
+    @_lazy
+    def image(self) -> list:
+        return [Image(image) for image in self.json.get("image", {})]
+
+    @_lazy
+    def stats(self):
+        return Stats(self.json)
+
+    @_lazy
+    def toptags(self) -> list:
+        return [Tag(tag) for tag in self.json.get("tags", {}).get("tag", {})]
+
+    @_lazy
+    def playing(self) -> bool:
+        return self.json.get("@attr", {}).get("nowplaying") == "true"
+
+    now_playing = playing
+
+    @property
+    def uts(self) -> int:
+        return int(self.json.get("date", {}).get("uts", 0))
+
+    @_lazy
+    def played(self) -> datetime:
+        return _timestamp(self.uts)
+
+    @property
+    def url(self) -> str:
+        return self.json.get("url")
+
+    @property
+    def mbid(self) -> str:
+        return self.json.get("mbid")
 
     def __str__(self):
         return self.name
 
 
 class Artist:
+    __slots__ = ("json", "_name", "_image", "_stats", "_tags", "_similar", "_bio")
+
     def __init__(self, json: dict):
-        self.name: str = json.get("name") or json.get("#text")
-        self.image: list = [Image(image) for image in json.get("image", {})]
-        self.stats: Stats = Stats(json)
-        self.tags: list = [Tag(tag) for tag in json.get("tags", {}).get("tag", {})]
-        self.similar: list = [Artist(artist) for artist in json.get("similar", {}).get("artists", {})]
-        self.bio: Info = Info(json.get("bio", {}))
-        self.url: str = json.get("url")
-        self.mbid = json.get("mbid")
+        self.json = json
+
+    @_lazy
+    def name(self) -> str:
+        return self.json.get("name") or self.json.get("#text")
+
+    @_lazy
+    def image(self) -> list:
+        return [Image(image) for image in self.json.get("image", {})]
+
+    @_lazy
+    def stats(self):
+        return Stats(self.json)
+
+    @_lazy
+    def tags(self) -> list:
+        return [Tag(tag) for tag in self.json.get("tags", {}).get("tag", {})]
+
+    @_lazy
+    def similar(self) -> list:
+        return [Artist(artist) for artist in self.json.get("similar", {}).get("artists", {})]
+
+    @_lazy
+    def bio(self):
+        return Info(self.json.get("bio", {}))
+
+    @property
+    def url(self) -> str:
+        return self.json.get("url")
+
+    @property
+    def mbid(self) -> str:
+        return self.json.get("mbid")
 
     def __str__(self):
         return self.name
 
 
 class Stats:
+    __slots__ = ("listeners", "playcount", "userplaycount")
+
     def __init__(self, json: dict):
         self.listeners: int = int(json.get("stats", {}).get("listeners") or json.get("listeners", 0))
         self.playcount: int = int(json.get("stats", {}).get("playcount") or json.get("playcount", 0))
@@ -87,12 +227,16 @@ class Stats:
 
 
 class Image:
+    __slots__ = ("url", "size")
+
     def __init__(self, json: dict):
         self.url: str = json.get("#text")
         self.size: str = json.get("size")
 
 
 class Tag:
+    __slots__ = ("name", "url", "count")
+
     def __init__(self, json: dict):
         self.name: str = json.get("name")
         self.url: str = json.get("url")
@@ -103,6 +247,8 @@ class Tag:
 
 
 class Info:
+    __slots__ = ("summary", "content", "published")
+
     def __init__(self, json: dict):
         self.summary: str = json.get("summary")
         self.content: str = json.get("content")
@@ -110,34 +256,239 @@ class Info:
 
 
 class SearchPage:
-    def __init__(self, json: dict, object_, string: str):
+    def __init__(self, json: dict, object_, string: str, pool: "InternPool" = None):
+        build = object_ if pool is None else lambda item: pool(object_, item)
         self.results: int = json.get("opensearch:totalResults")
-        self.matches = self.items = [object_(item) for item in json.get(string + "matches", {}).get(string)]
+        self.matches = self.items = [build(item) for item in json.get(string + "matches", {}).get(string)]
         # lastfm api weird
 
 
 class ObjectPage:
-    def __init__(self, json: dict, object_, string: str):
-        self.results = self.items = self.matches = [object_(item) for item in json.get(string)]
+    def __init__(self, json: dict, object_, string: str, pool: "InternPool" = None):
+        build = object_ if pool is None else lambda item: pool(object_, item)
+        self.results = self.items = self.matches = [build(item) for item in json.get(string)]
         self.page: int = json.get("@attr").get("page")
         self.per_page: int = json.get("@attr").get("perPage")
         self.pages: int = json.get("@attr").get("totalPages")
         self.total: int = json.get("@attr").get("total")
-        self.from_ = datetime.utcfromtimestamp(int(json.get("@attr", {}).get("from", 0)))
-        self.to = datetime.utcfromtimestamp(int(json.get("@attr", {}).get("to", 0)))
+        self.from_ = _timestamp(json.get("@attr", {}).get("from", 0))
+        self.to = _timestamp(json.get("@attr", {}).get("to", 0))
 
 
 class User:
+    __slots__ = ("json", "_image", "_registered")
+
     def __init__(self, json: dict):
-        self.name = self.username = json.get("name")
-        self.real_name: str = json.get("realname")
-        self.url: str = json.get("url")
-        self.image: list = [Image(image) for image in json.get("image", {})]
-        self.country = json.get("country") if json.get("country") != "None" else None
+        self.json = json
+
+    @property
+    def name(self) -> str:
+        return self.json.get("name")
+
+    username = name
+
+    @property
+    def real_name(self) -> str:
+        return self.json.get("realname")
+
+    @property
+    def url(self) -> str:
+        return self.json.get("url")
+
+    @_lazy
+    def image(self) -> list:
+        return [Image(image) for image in self.json.get("image", {})]
+
+    @property
+    def country(self):
+        return self.json.get("country") if self.json.get("country") != "None" else None
         # yes for our json api was should make none be expressed as a string and not as null
-        self.age: int = json.get("age")
-        self.playcount = self.scrobbles = json.get("playcount")
-        self.playlists: int = json.get("playlists")
-        self.bootstrap: int = json.get("bootstrap")  # no clue what this is
-        self.registered = self.created_at = datetime.utcfromtimestamp(
-            int(json.get("registered", {}).get("unixtime", 0)))
+
+    @property
+    def age(self) -> int:
+        return self.json.get("age")
+
+    @property
+    def playcount(self):
+        return self.json.get("playcount")
+
+    scrobbles = playcount
+
+    @property
+    def playlists(self) -> int:
+        return self.json.get("playlists")
+
+    @property
+    def bootstrap(self) -> int:
+        return self.json.get("bootstrap")  # no clue what this is
+
+    @_lazy
+    def registered(self) -> datetime:
+        return _timestamp(self.json.get("registered", {}).get("unixtime", 0))
+
+    created_at = registered
+
+
+def _name(json: dict) -> str:
+    return json.get("name") or json.get("title") or json.get("#text") or ""
+
+
+def _counts(json: dict) -> tuple:
+    # data that differs between responses for the same entity, such as plays and ranks of top lists and charts
+    attr, stats = json.get("@attr"), json.get("stats")
+    return (json.get("playcount"), json.get("listeners"), json.get("userplaycount"),
+            tuple(attr.items()) if isinstance(attr, dict) else attr,
+            tuple(stats.items()) if isinstance(stats, dict) else stats)
+
+
+class InternPool:
+    """
+    Opt-in identity map that makes equal artists and albums nested in tracks, images and tags of every response
+    built through it share one instance, so that a history of thousands of tracks holds every artist once
+    The items of a page are built as usual, only the objects nested in them are shared, so the plays and ranks of
+    top lists and charts are never mixed up between responses
+    Artists are identified by mbid or name, albums by mbid or name and artist, images by url and size, tags by name
+    Responses are not modified, pooled objects hold interned copies of their JSON, treat those as read-only
+    Pass it to ObjectPage or SearchPage, or to LastFMClient to pool every page it returns
+    """
+
+    def __init__(self, *, strings: bool = True):
+        """
+        :param strings: Whether strings of the pooled JSON are interned with sys.intern
+        """
+        self.strings = strings
+        self._entries = {}  # key -> shared object, or (shared json, shared object) for images and tags
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __call__(self, object_, json: dict):
+        """
+        Builds an item of a page, artists, albums and tracks are new objects whose nested objects are shared
+        :param object_: Artist, Album, Track, Image or Tag
+        """
+        if object_ is Artist or object_ is Album:
+            return self._build(object_, json)
+        if object_ is Track:
+            return self.track(json)
+        if object_ is Image:
+            return self.image(json)
+        if object_ is Tag:
+            return self.tag(json)
+        return object_(json)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def _get(self, key):
+        found = self._entries.get(key)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def _intern(self, json: dict) -> dict:
+        # a copy, the response may be held by the cache or the caller
+        if not self.strings:
+            return dict(json)
+        return {name: sys.intern(value) if type(value) is str else value for name, value in json.items()}
+
+    def _image(self, json: dict) -> tuple:
+        key = ("image", json.get("#text"), json.get("size"))
+        found = self._get(key)
+        if found is None:
+            json = self._intern(json)
+            found = self._entries[key] = (json, Image(json))
+        return found
+
+    def _images(self, images: list) -> tuple:
+        key = ("images",) + tuple((image.get("#text"), image.get("size")) for image in images)
+        found = self._get(key)
+        if found is None:
+            shared = [self._image(image) for image in images]
+            found = self._entries[key] = ([json for json, _ in shared], [image for _, image in shared])
+        return found
+
+    def _tag(self, json: dict) -> tuple:
+        key = ("tag", json.get("name"), json.get("url"), json.get("count"))
+        found = self._get(key)
+        if found is None:
+            json = self._intern(json)
+            found = self._entries[key] = (json, Tag(json))
+        return found
+
+    def image(self, json: dict) -> Image:
+        return self._image(json)[1]
+
+    def images(self, images: list) -> list:
+        """
+        :return: list of Image shared by every object with the same images
+        """
+        return self._images(images)[1]
+
+    def tag(self, json: dict) -> Tag:
+        return self._tag(json)[1]
+
+    def _build(self, object_, json: dict):
+        # builds object_ from an interned copy of json whose nested objects are replaced with shared ones,
+        # which are also set on the lazy attributes
+        json = self._intern(json)
+        built = object_(json)
+        artist = json.get("artist")
+        if isinstance(artist, dict):
+            built.artist = self.artist(artist)
+            json["artist"] = built.artist.json
+        if isinstance(json.get("image"), list):
+            json["image"], built.image = self._images(json["image"])
+        tags = json.get("tags")
+        if isinstance(tags, dict) and isinstance(tags.get("tag"), list):
+            shared = [self._tag(tag) for tag in tags["tag"]]
+            json["tags"] = dict(tags, tag=[tag for tag, _ in shared])
+            setattr(built, "tags" if object_ is Artist else "toptags", [tag for _, tag in shared])
+        return built
+
+    def artist(self, json):
+        """
+        :param json: Artist object of a response, for example the artist of a track, or just a name
+        :return: The shared Artist, or the interned name
+        """
+        if not isinstance(json, dict):
+            return sys.intern(json) if self.strings and type(json) is str else json
+        key = ("artist", json.get("mbid") or _name(json), tuple(json), _counts(json))
+        found = self._get(key)
+        if found is None:
+            found = self._entries[key] = self._build(Artist, json)
+        return found
+
+    def album(self, json: dict, artist: str = None) -> Album:
+        """
+        :param json: Album object of a response, for example the album of a track
+        :param artist: Name of the artist, for albums that do not include it (like those in recent tracks)
+        :return: The shared Album
+        """
+        owner = json.get("artist")
+        owner = _name(owner) if isinstance(owner, dict) else owner or artist
+        key = ("album", json.get("mbid") or _name(json), owner, tuple(json), _counts(json))
+        found = self._get(key)
+        if found is None:
+            found = self._entries[key] = self._build(Album, json)
+        return found
+
+    def track(self, json: dict) -> Track:
+        """
+        Builds a Track whose artist, album, images and tags are shared, the track itself is not (every scrobble differs)
+        :param json: Track object of a response
+        :return: Track
+        """
+        track = self._build(Track, json)
+        json = track.json
+        album = json.get("album")
+        if isinstance(album, dict):
+            artist = json.get("artist")
+            track.album = self.album(album, _name(artist) if isinstance(artist, dict) else artist)
+            json["album"] = track.album.json
+        return track
@@ -0,0 +1,140 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Union
+
+from . import objects
+from .retry import RetryPolicy
+
+
+def _has_next(page: Union[objects.ObjectPage, objects.SearchPage], number: int, seen: int) -> bool:
+    if not page.items:
+        return False
+    if isinstance(page, objects.ObjectPage):
+        return number < int(page.pages or 0)
+    return seen < int(page.results or 0)
+
+
+async def paginate(fetch: Callable[[int], Awaitable[Union[objects.ObjectPage, objects.SearchPage]]], *,
+                   start: int = 1, max_items: int = None, prefetch: bool = True,
+                   skip: Callable[[object], bool] = None) -> AsyncIterator:
+    """
+    Yields the items of every page of a paged endpoint, requesting pages only as they are needed
+    :param fetch: Coroutine function that takes a page number and returns the objects.ObjectPage or objects.SearchPage
+    :param start: Page to start from
+    :param max_items: Stop after this many items have been yielded
+    :param prefetch: Whether to request the next page while the items of the current one are being consumed
+    :param skip: Items this returns True for are not yielded (and not counted towards max_items)
+    :return: Async iterator of the items
+    """
+    number = start
+    current = await fetch(number)
+    seen = count = 0
+    pending = None
+    try:
+        while True:
+            seen += len(current.items)
+            has_next = _has_next(current, number, seen)
+            if has_next and prefetch:
+                pending = asyncio.ensure_future(fetch(number + 1))
+            for item in current.items:
+                if skip is not None and skip(item):
+                    continue
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+            if not has_next:
+                return
+            number += 1
+            if pending is not None:
+                current, pending = await pending, None
+            else:
+                current = await fetch(number)
+    finally:
+        if pending is not None and not pending.cancel() and not pending.cancelled():
+            pending.exception()  # already finished, retrieve a possible exception so it does not get logged
+
+
+async def _fetch_page(fetch: Callable[[int], Awaitable[objects.ObjectPage]], number: int, semaphore: asyncio.Semaphore,
+                      retry: RetryPolicy = None) -> objects.ObjectPage:
+    async def attempt():
+        async with semaphore:  # not held while waiting to retry
+            return await fetch(number)
+
+    return await (attempt() if retry is None else retry.call(attempt))
+
+
+async def fetch_all(fetch: Callable[[int], Awaitable[objects.ObjectPage]], *, start: int = 1, concurrency: int = 4,
+                    retries: int = 0, skip: Callable[[object], bool] = None,
+                    key: Callable[[object], object] = None) -> AsyncIterator:
+    """
+    Yields the items of every page of a paged endpoint in order, requesting up to concurrency pages at once
+    The first page is requested alone to find out how many pages there are
+    :param fetch: Coroutine function that takes a page number and returns the objects.ObjectPage
+    :param start: Page to start from
+    :param concurrency: Maximum amount of pages being requested at once
+    :param retries: Times a page is requested again after a transient error, leave it at 0 if fetch already retries
+    :param skip: Items this returns True for are not yielded
+    :param key: Items with the same key as an item of the previous page are not yielded again
+    :return: Async iterator of the items
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    retry = RetryPolicy(retries) if retries else None
+    first = await _fetch_page(fetch, start, semaphore, retry)
+    pages = int(first.pages or 0)
+    upcoming = iter(range(start + 1, pages + 1))
+    window = deque()
+
+    def schedule():
+        number = next(upcoming, None)
+        if number is not None:
+            window.append(asyncio.ensure_future(_fetch_page(fetch, number, semaphore, retry)))
+
+    for _ in range(concurrency):
+        schedule()
+    previous = set()
+    current = first
+    try:
+        while True:
+            keys = set()
+            for item in current.items:
+                if skip is not None and skip(item):
+                    continue
+                if key is not None:
+                    identifier = key(item)
+                    keys.add(identifier)
+                    if identifier in previous:
+                        continue
+                yield item
+            previous = keys
+            if not window:
+                return
+            current = await window.popleft()
+            schedule()
+    finally:
+        for task in window:
+            task.cancel()
@@ -0,0 +1,98 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket that schedules the requests made with one API key
+    Slows down when last.fm reports a ratelimit (29) or temporary (16) error and speeds back up gradually
+    Share one instance between clients that use the same API key
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 5, *, min_rate: float = 0.5, backoff: float = 0.5,
+                 recovery: float = 0.05, cooldown: float = 1.0):
+        """
+        :param rate: Requests per second allowed when last.fm is not complaining
+        :param burst: Amount of requests that can be sent at once after being idle
+        :param min_rate: The rate will never be lowered below this
+        :param backoff: Factor the rate is multiplied by after a ratelimit or temporary error
+        :param recovery: Requests per second added back to the rate after every successful request
+        :param cooldown: Seconds no requests are sent for after a ratelimit or temporary error
+        """
+        self.rate = self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.backoff = backoff
+        self.recovery = recovery
+        self.cooldown = cooldown
+        self.tokens = float(burst)
+        self.waited = 0.0  # total seconds spent waiting for a token
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Waits until a request may be sent
+        :return: Seconds spent waiting
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()  # created here so it belongs to the running loop
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        waited = time.monotonic() - start
+        self.waited += waited
+        return waited
+
+    def penalize(self):
+        """
+        Called when last.fm reports a ratelimit or temporary error
+        """
+        self.rate = max(self.min_rate, self.rate * self.backoff)
+        self.tokens = 0.0
+        self._blocked_until = time.monotonic() + self.cooldown
+
+    def reward(self):
+        """
+        Called after a successful request
+        """
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.recovery)
@@ -22,26 +22,37 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import AsyncIterator, Optional
+
 import aiohttp
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from . import decoding
 from . import exceptions
+from . import metrics
+from .cache import ResponseCache, key as request_key
+from .circuit import CircuitBreaker
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
 
 URL = "http://ws.audioscrobbler.com/2.0"
 
 
-async def get(api: str, method: str, **kwargs) -> dict:
-    """
-    Sends a get request to the last.fm API
-    :param api: API key
-    :param method: last.fm API method
-    :param kwargs: Will be converted to HTTP attributes (&key=value)
-    :return: dict (JSON) of the API response
-    """
+def _url(api: str, method: str, kwargs: dict, url: str = None) -> str:
     parameters = "".join([f"&{key}={value}" for key, value in kwargs.items() if bool(value)])
     if kwargs.get("from_"):  # keywords go brr
         parameters += f"&from={kwargs.get('from_')}"
-    async with aiohttp.request("GET", f"{URL}?method={method}{parameters}&api_key={api}&format=json") as response:
-        json = await response.json()
+    return f"{url or URL}?method={method}{parameters}&api_key={api}&format=json"
+
+
+def _raise_for_error(json: dict):
     if bool(json.get("error")):
         if json["error"] == 6:
             raise exceptions.InvalidInputError(json["message"])
@@ -55,4 +66,382 @@ async def get(api: str, method: str, **kwargs) -> dict:
             raise exceptions.APIKeySuspendedError(json["message"])
         elif json["error"] == 29:
             raise exceptions.RatelimitExceededError(json["message"])
+
+
+class _Recorder:
+    # keeps a streamed body around until its first item is parsed, so that error responses can still be decoded
+    # and counts the bytes and the seconds spent reading it
+    def __init__(self, content: aiohttp.StreamReader):
+        self.content = content
+        self.chunks = []
+        self.size = 0
+        self.reading = 0.0
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(self.chunks)
+
+    def release(self):
+        self.chunks = None
+
+    async def read(self, n: int = -1) -> bytes:
+        start = time.perf_counter()
+        chunk = await self.content.read(n)
+        self.reading += time.perf_counter() - start
+        self.size += len(chunk)
+        if self.chunks is not None:
+            self.chunks.append(chunk)
+        return chunk
+
+
+def _retrieve(task: asyncio.Future):
+    # marks the exception as retrieved in case every caller waiting on a coalesced request was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def get(api: str, method: str, **kwargs) -> dict:
+    """
+    Sends a get request to the last.fm API
+    Opens a new connection for every call, use HTTPClient to reuse connections
+    :param api: API key
+    :param method: last.fm API method
+    :param kwargs: Will be converted to HTTP attributes (&key=value)
+    :return: dict (JSON) of the API response
+    """
+    async with aiohttp.request("GET", _url(api, method, kwargs)) as response:
+        json = await response.json()
+    _raise_for_error(json)
     return json
+
+
+class HTTPClient:
+    """
+    Owns the pooled aiohttp session that every endpoint of a LastFMClient sends its requests through
+    The session is created lazily on the first request so that it is bound to the running event loop
+    """
+
+    def __init__(self, api: str, *, session: aiohttp.ClientSession = None, limit: int = 100,
+                 limit_per_host: int = 0, keepalive_timeout: float = 15.0, dns_cache_ttl: int = 300,
+                 rate: float = 5.0, burst: int = 5, ratelimiter: RateLimiter = None, cache: ResponseCache = None,
+                 coalesce: bool = True, retries: int = 3, retry: RetryPolicy = None,
+                 breaker: CircuitBreaker = None, timeout: float = 30.0, loads=None, executor: Executor = None,
+                 offload_threshold: int = 256 * 1024, hooks: list = None, trace_configs: list = None,
+                 url: str = None):
+        """
+        :param api: API key
+        :param session: An existing aiohttp.ClientSession to use instead of creating one, close() does not close it
+        :param limit: Maximum amount of simultaneous connections
+        :param limit_per_host: Maximum amount of simultaneous connections to the same host (0 for no limit)
+        :param keepalive_timeout: Seconds an idle connection is kept open for reuse
+        :param dns_cache_ttl: Seconds resolved DNS entries are cached for (None to cache forever)
+        :param rate: Requests per second sent with this API key (None to disable ratelimiting)
+        :param burst: Amount of requests that can be sent at once after being idle
+        :param ratelimiter: An existing RateLimiter to use instead of creating one from rate and burst
+        :param cache: ResponseCache that responses are read from and stored in
+        :param coalesce: Whether identical requests made while one is in flight share its response
+        :param retries: Times a request is sent again after a transient error (0 to disable retrying)
+        :param retry: An existing RetryPolicy to use instead of creating one from retries
+        :param breaker: CircuitBreaker that stops requests from being sent while last.fm is failing,
+        stale cached responses are returned while it is open
+        :param timeout: Default seconds a request may take in total, including retries (None for no limit)
+        :param loads: Function that decodes JSON from bytes, defaults to the fastest installed (see decoding.BACKEND)
+        :param executor: concurrent.futures executor that responses of at least offload_threshold bytes are decoded in
+        so that decoding them does not block the event loop, a ThreadPoolExecutor is usually the right choice
+        (a ProcessPoolExecutor has to send the decoded dict back, which only pays off with the stdlib json decoder)
+        :param offload_threshold: Size in bytes from which responses are decoded in the executor
+        :param hooks: Callables that are passed a metrics.RequestEvent after every request and a metrics.CacheEvent
+        after every cache lookup, for example metrics.Metrics() or metrics.PrometheusMetrics()
+        :param trace_configs: aiohttp.TraceConfig objects passed to the session for lower level tracing
+        :param url: Base URL of the API, defaults to URL (useful to point the client at a stub server)
+        """
+        self.api = api
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.ratelimiter = ratelimiter or (RateLimiter(rate, burst) if rate else None)
+        self.cache = cache
+        self.coalesce = coalesce
+        self.retry = retry or (RetryPolicy(retries) if retries else None)
+        self.breaker = breaker
+        self.timeout = timeout
+        self.loads = loads or decoding.loads
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.hooks = list(hooks or [])
+        self.trace_configs = trace_configs
+        self.url = url
+        self._inflight = {}
+        self._session = session
+        self._owns_session = session is None
+        self._closed = False
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._closed:
+            raise RuntimeError("HTTPClient is closed, requests can not be sent through it anymore")
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout,
+                                             ttl_dns_cache=self.dns_cache_ttl, use_dns_cache=True)
+            # no total timeout, every request sets its own so that the timeout of a call can exceed the default
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(),
+                                                  trace_configs=self.trace_configs)
+            self._owns_session = True
+        return self._session
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def get(self, method: str, *, timeout: float = None, **kwargs) -> dict:
+        """
+        Sends a get request to the last.fm API over the pooled session
+        :param method: last.fm API method
+        :param timeout: Seconds the request may take in total, including retries, defaults to the client timeout
+        :param kwargs: Will be converted to HTTP attributes (&key=value)
+        :return: dict (JSON) of the API response
+        :raises asyncio.TimeoutError: If the response did not arrive in time
+        """
+        if self.cache is not None:
+            cached, fresh = self.cache.lookup(method, kwargs)
+            if self.hooks and self.cache.ttl(method) > 0:
+                result = metrics.MISS if cached is None else metrics.HIT if fresh else metrics.STALE
+                self._emit(metrics.CacheEvent(method.lower(), result))
+            if cached is not None:
+                if not fresh:
+                    self._revalidate(method, kwargs)
+                return cached
+        timeout = self.timeout if timeout is None else timeout
+        if timeout is None:
+            return await self._get(method, kwargs, timeout)
+        return await asyncio.wait_for(self._get(method, kwargs, timeout), timeout)
+
+    async def get_raw(self, method: str, *, timeout: float = None, **kwargs) -> bytes:
+        """
+        Same as get but returns the body of the response without decoding it, for callers that only forward it
+        Errors are still detected and raised, responses are not cached or coalesced
+        """
+        timeout = self.timeout if timeout is None else timeout
+        send = self._send(method, kwargs, timeout, raw=True)
+        return await (send if timeout is None else asyncio.wait_for(send, timeout))
+
+    async def stream(self, method: str, prefix: str, *, timeout: float = None, **kwargs) -> AsyncIterator[dict]:
+        """
+        Sends a get request and yields the items of the response as they are parsed from the body
+        This keeps memory low and yields the first item early for very large responses
+        Parsing is incremental when ijson is installed (install lastfmpy[streaming]),
+        otherwise the body is decoded at once and its items are yielded afterwards
+        Responses are not cached, coalesced or retried, hooks are passed a RequestEvent once the response is done
+        :param method: last.fm API method
+        :param prefix: Path of the items in the response, for example "recenttracks.track.item"
+        :param timeout: Seconds the whole response may take, defaults to the client timeout
+        :param kwargs: Will be converted to HTTP attributes (&key=value)
+        :return: Async iterator of the JSON dicts of the items
+        """
+        timeout = self.timeout if timeout is None else timeout
+        token = self.breaker.before() if self.breaker is not None else None
+        waited = paused = 0.0  # paused is the time the caller spent between items, it is not part of the latency
+        sent = received = decoded = None
+        status = error = None
+        size = 0
+        try:  # a stream cancelled while waiting for the limiter gives its half-open trial slot back as well
+            if self.ratelimiter is not None:
+                waited = await self.ratelimiter.acquire()
+            sent = time.perf_counter()
+            async with self.session.get(_url(self.api, method, kwargs, self.url),
+                                        timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                status = response.status
+                if ijson is None or response.status >= 400:
+                    body = await response.read()
+                    received, size = time.perf_counter(), len(body)
+                    json = await self._decode(response.status, response.reason, body)
+                    decoded = time.perf_counter()
+                    items = json
+                    for key in prefix.split(".")[:-1]:
+                        items = items.get(key, {})
+                    for item in items or []:
+                        pause = time.perf_counter()
+                        yield item
+                        paused += time.perf_counter() - pause
+                else:
+                    content = _Recorder(response.content)
+                    headers = time.perf_counter()
+                    count = 0
+                    try:
+                        async for item in ijson.items(content, prefix, use_float=True):
+                            if not count:
+                                content.release()
+                            count += 1
+                            pause = time.perf_counter()
+                            yield item
+                            paused += time.perf_counter() - pause
+                    except ijson.JSONError:
+                        if count:
+                            raise
+                        # not JSON, decoded whole to raise the same error as get
+                        await content.read()
+                        await self._decode(response.status, response.reason, content.body)
+                        raise
+                    finally:
+                        size = content.size
+                    # reading and parsing are interleaved, their times are told apart by the time spent reading
+                    received = headers + content.reading
+                    decoded = time.perf_counter() - paused
+                    if not count:  # the whole body is still buffered, decoded to find out if it is an error
+                        await self._decode(response.status, response.reason, content.body)
+        except BaseException as exception:
+            error = exception if not isinstance(exception, GeneratorExit) else None  # the caller stopped early
+            if self.breaker is not None:
+                self.breaker.failure(exception, token)
+            raise
+        finally:
+            if self.hooks and sent is not None:
+                end = time.perf_counter() - paused
+                self._emit(metrics.RequestEvent(
+                    method.lower(), status, type(error).__name__ if error is not None else None,
+                    getattr(error, "code", None), size, (received or end) - sent,
+                    (decoded or end) - received if received is not None else 0.0, waited))
+        if self.breaker is not None:
+            self.breaker.success(token)
+
+    async def _get(self, method: str, kwargs: dict, timeout: Optional[float]) -> dict:
+        # a coalesced request keeps the timeout of the caller that started it, every caller still waits for its own
+        if not self.coalesce:
+            return await self._send(method, kwargs, timeout)
+        identifier = request_key(method, kwargs)
+        inflight = self._inflight.get(identifier)
+        if inflight is None or inflight[0].cancelled():
+            task = asyncio.ensure_future(self._send(method, kwargs, timeout))
+            inflight = self._inflight[identifier] = [task, 0]
+            task.add_done_callback(lambda _: self._forget(identifier, task))
+            task.add_done_callback(_retrieve)
+        inflight[1] += 1
+        try:
+            # shielded so that a cancelled caller does not cancel the request for everyone else waiting on it
+            return await asyncio.shield(inflight[0])
+        finally:
+            inflight[1] -= 1
+            if not inflight[1]:
+                # nobody is waiting for the response anymore, release the connection
+                # forgotten first so that a caller arriving before the task is done cancelling starts a new one
+                self._forget(identifier, inflight[0])
+                inflight[0].cancel()
+
+    def _revalidate(self, method: str, kwargs: dict):
+        # refreshes a stale cached response in the background, once per request no matter how often it is read
+        identifier = request_key(method, kwargs)
+        if identifier in self._inflight:
+            return
+        task = asyncio.ensure_future(self._send(method, kwargs, self.timeout))
+        self._inflight[identifier] = [task, 1]  # counts as a waiter so that callers giving up do not cancel it
+        task.add_done_callback(lambda _: self._forget(identifier, task))
+        task.add_done_callback(_retrieve)
+
+    def _forget(self, identifier: str, task: asyncio.Future):
+        if self._inflight.get(identifier, (None,))[0] is task:
+            del self._inflight[identifier]
+
+    async def _send(self, method: str, kwargs: dict, timeout: Optional[float], raw: bool = False):
+        try:
+            if self.retry is not None:
+                json = await self.retry.call(self._attempt, method, kwargs, raw, timeout)
+            else:
+                json = await self._attempt(method, kwargs, raw, timeout)
+        except exceptions.CircuitOpenError:
+            stale = self.cache.get_stale(method, kwargs) if self.cache is not None and not raw else None
+            if stale is None:
+                raise
+            return stale
+        if self.cache is not None and not raw:
+            self.cache.set(method, kwargs, json)
+        return json
+
+    async def _attempt(self, method: str, kwargs: dict, raw: bool, timeout: Optional[float]):
+        if self.breaker is None:
+            return await self._request(method, kwargs, raw, timeout)
+        token = self.breaker.before()
+        try:
+            json = await self._request(method, kwargs, raw, timeout)
+        except BaseException as error:  # cancellations give a half-open trial slot back
+            self.breaker.failure(error, token)
+            raise
+        self.breaker.success(token)
+        return json
+
+    async def _request(self, method: str, kwargs: dict, raw: bool, timeout: Optional[float]):
+        waited = await self.ratelimiter.acquire() if self.ratelimiter is not None else 0.0
+        sent = time.perf_counter()
+        received = decoded = None
+        status = error = None
+        size = 0
+        try:
+            async with self.session.get(_url(self.api, method, kwargs, self.url),
+                                        timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                body = await response.read()
+            received = time.perf_counter()
+            status, size = response.status, len(body)
+            # only bodies that mention an error key anywhere are decoded to check, the others cannot be errors
+            if raw and response.status < 400 and b'"error"' not in body:
+                if self.ratelimiter is not None:
+                    self.ratelimiter.reward()
+                return body
+            json = await self._decode(response.status, response.reason, body)
+            decoded = time.perf_counter()
+            return body if raw else json
+        except BaseException as exception:
+            error = exception
+            raise
+        finally:
+            if self.hooks:
+                end = time.perf_counter()
+                self._emit(metrics.RequestEvent(
+                    method.lower(), status, type(error).__name__ if error is not None else None,
+                    getattr(error, "code", None), size, (received or end) - sent,
+                    (decoded or end) - received if received is not None else 0.0, waited))
+
+    def _emit(self, event: metrics.Event):
+        # a failing hook is reported instead of raised, it must not replace the response or the error of a request
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as error:
+                asyncio.get_event_loop().call_exception_handler({
+                    "message": "Exception in HTTPClient hook",
+                    "exception": error,
+                })
+
+    async def _decode(self, status: int, reason: str, body: bytes) -> dict:
+        try:
+            if self.executor is not None and len(body) >= self.offload_threshold:
+                json = await asyncio.get_event_loop().run_in_executor(self.executor, self.loads, body)
+            else:
+                json = self.loads(body)
+        except ValueError:
+            json = None
+        if not isinstance(json, dict):
+            if status >= 400:
+                if status == 429 and self.ratelimiter is not None:
+                    self.ratelimiter.penalize()
+                raise exceptions.HTTPError(status, reason)
+            raise exceptions.OperationFailedError("The API responded with something that is not a JSON object")
+        try:
+            _raise_for_error(json)
+        except (exceptions.RatelimitExceededError, exceptions.TemporaryError):
+            if self.ratelimiter is not None:
+                self.ratelimiter.penalize()
+            raise
+        if self.ratelimiter is not None:
+            self.ratelimiter.reward()
+        return json
+
+    async def close(self):
+        """
+        Closes the underlying session if it was created by this HTTPClient
+        Requests made afterwards raise RuntimeError instead of opening a new session
+        """
+        self._closed = True
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
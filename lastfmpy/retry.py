@@ -0,0 +1,95 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from . import exceptions
+
+TRANSIENT = (exceptions.OperationFailedError, exceptions.ServiceOfflineError, exceptions.TemporaryError,
+             exceptions.RatelimitExceededError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+             asyncio.TimeoutError)
+
+
+class RetryPolicy:
+    """
+    Decides which errors are worth sending a request again for and how long to wait before doing so
+    Waits are exponential with full jitter: a random amount between 0 and base * 2 ** attempt, capped at cap
+    """
+
+    def __init__(self, retries: int = 3, *, base: float = 0.5, cap: float = 10.0, deadline: float = 30.0):
+        """
+        :param retries: Times a request is sent again after a transient error
+        :param base: Seconds the first retry waits for at most
+        :param cap: Seconds a single retry waits for at most
+        :param deadline: Seconds after the first attempt after which no more retries are made
+        """
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+        self.deadline = deadline
+        self.attempts = 0  # requests sent, including retries
+        self.retried = 0  # retries made
+        self.exhausted = 0  # requests that still failed with a transient error after retrying
+
+    @staticmethod
+    def is_transient(error: BaseException) -> bool:
+        """
+        Whether an error is worth retrying for
+        InvalidInputError and APIKeySuspendedError will never succeed when retried, neither will 4xx HTTP errors
+        """
+        if isinstance(error, exceptions.HTTPError):
+            return error.status >= 500 or error.status == 429
+        return isinstance(error, TRANSIENT)
+
+    def delay(self, attempt: int) -> float:
+        """
+        :param attempt: How many times the request has been retried already
+        :return: Seconds to wait before the next retry
+        """
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    async def call(self, function, *args, **kwargs):
+        """
+        Awaits function(*args, **kwargs), retrying it according to this policy
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            self.attempts += 1
+            try:
+                return await function(*args, **kwargs)
+            except Exception as error:
+                if not self.is_transient(error):
+                    raise
+                delay = self.delay(attempt)
+                if attempt >= self.retries or time.monotonic() - start + delay > self.deadline:
+                    self.exhausted += 1
+                    raise
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,246 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Tuple, Union
+
+from . import columnar
+from .utils import DAY
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+Time = Union[int, datetime, None]
+
+
+class Streak(NamedTuple):
+    start: datetime  # midnight of the first day
+    days: int
+    plays: int
+
+
+class Diversity(NamedTuple):
+    unique: int
+    entropy: float  # shannon entropy in bits of the share of plays of every artist, album or track
+    evenness: float  # entropy divided by its maximum, 1.0 when every one was played as often
+    top_share: float  # share of plays that went to the most played one
+
+
+def _seconds(value: Time, default: int) -> int:
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+class ListeningStats:
+    """
+    Listening statistics of a scrobble history, computed with numpy over arrays built once from a ColumnPage
+    Scrobbles are kept sorted by time so that any window is a slice found with a binary search, and the amount
+    of plays per day is kept as a prefix sum so that plays and streaks do not have to look at every scrobble
+    Times are UNIX timestamps or datetimes, start is inclusive and end is exclusive
+    """
+
+    def __init__(self, history: columnar.ColumnPage, *, utc_offset: int = 0):
+        """
+        :param history: Recent tracks of a user, for example from User.get_history, the now playing track is ignored
+        :param utc_offset: Seconds added to the timestamps before hours, weekdays and days are worked out
+        """
+        if numpy is None:
+            raise ImportError("numpy is required for listening statistics, install lastfmpy[numpy]")
+        self.history = history
+        self.utc_offset = utc_offset
+        keep = ~history.playing & (history.uts > 0)
+        order = numpy.argsort(history.uts[keep], kind="stable")
+        self.uts = history.uts[keep][order]
+        self.codes = {column: history.codes[column][keep][order] for column in ("artist", "album")}
+        self.categories = {column: history.categories[column] for column in ("artist", "album")}
+        # a track is a name by an artist, so equal names by different artists get different codes
+        names = history.codes["name"][keep][order].astype(numpy.int64)
+        pairs = self.codes["artist"].astype(numpy.int64) * max(len(history.categories["name"]), 1) + names
+        _, first, self.codes["track"] = numpy.unique(pairs, return_index=True, return_inverse=True)
+        self.codes["track"] = self.codes["track"].astype(numpy.int32)
+        artists, tracks = history.categories["artist"], history.categories["name"]
+        self.categories["track"] = [(artists[self.codes["artist"][index]], tracks[names[index]]) for index in first]
+        local = self.uts + utc_offset
+        self.hour = (local // 3600 % 24).astype(numpy.int8)
+        self.weekday = ((local // DAY + 3) % 7).astype(numpy.int8)  # 1970-01-01 was a thursday, monday is 0
+        day = local // DAY
+        self.first_day = int(day[0]) if len(day) else 0
+        self.days = numpy.bincount(day - self.first_day) if len(day) else numpy.zeros(0, dtype=numpy.int64)
+        self.cumulative = numpy.concatenate(([0], numpy.cumsum(self.days)))
+
+    def __len__(self):
+        return len(self.uts)
+
+    def update(self, scrobbles: columnar.ColumnPage) -> "ListeningStats":
+        """
+        Adds newer scrobbles, scrobbles already in the history are not counted twice
+        :param scrobbles: ColumnPage of recent tracks
+        :return: new ListeningStats
+        """
+        known = int(self.uts[-1]) if len(self.uts) else 0
+        scrobbles = columnar.ColumnPage.concat([scrobbles])
+        scrobbles.playing = scrobbles.playing | (scrobbles.uts <= known)
+        return ListeningStats(columnar.ColumnPage.concat([self.history, scrobbles]), utc_offset=self.utc_offset)
+
+    def _slice(self, start: Time, end: Time) -> slice:
+        return slice(0 if start is None else int(numpy.searchsorted(self.uts, _seconds(start, 0))),
+                     len(self.uts) if end is None else int(numpy.searchsorted(self.uts, _seconds(end, 0))))
+
+    def _day(self, value: Time, default: int) -> int:
+        if value is None:
+            return default
+        return -(-(_seconds(value, 0) + self.utc_offset) // DAY) - self.first_day  # rounded up to a whole day
+
+    def _date(self, day: int) -> datetime:
+        offset = timezone(timedelta(seconds=self.utc_offset))
+        return datetime.fromtimestamp((self.first_day + day) * DAY - self.utc_offset, offset)
+
+    def plays(self, start: Time = None, end: Time = None) -> int:
+        """
+        :return: Amount of scrobbles between start and end
+        """
+        window = self._slice(start, end)
+        return max(window.stop - window.start, 0)
+
+    def top(self, column: str = "artist", n: int = 10, start: Time = None, end: Time = None) -> list:
+        """
+        Most played artists, albums or tracks between start and end
+        :param column: artist, album or track
+        :param n: Amount of results
+        :return: list of (name, plays) tuples, most played first, names of tracks are (artist, track) tuples
+        """
+        counts = self.counts(column, start, end)
+        n = min(n, numpy.count_nonzero(counts))
+        if not n:
+            return []
+        best = numpy.argpartition(-counts, n - 1)[:n]
+        best = best[numpy.lexsort((best, -counts[best]))]
+        categories = self.categories[column]
+        return [(categories[code], int(counts[code])) for code in best]
+
+    def counts(self, column: str = "artist", start: Time = None, end: Time = None) -> "numpy.ndarray":
+        """
+        :param column: artist, album or track
+        :return: int64 array of plays of every artist, album or track between start and end, indexed by code
+        """
+        return numpy.bincount(self.codes[column][self._slice(start, end)], minlength=len(self.categories[column]))
+
+    def hours(self, start: Time = None, end: Time = None) -> "numpy.ndarray":
+        """
+        :return: int64 array of 24 amounts of plays, one for every hour of the day
+        """
+        return numpy.bincount(self.hour[self._slice(start, end)], minlength=24)
+
+    def weekdays(self, start: Time = None, end: Time = None) -> "numpy.ndarray":
+        """
+        :return: int64 array of 7 amounts of plays, monday first
+        """
+        return numpy.bincount(self.weekday[self._slice(start, end)], minlength=7)
+
+    def heatmap(self, start: Time = None, end: Time = None) -> "numpy.ndarray":
+        """
+        :return: int64 array of shape (7, 24) of plays per weekday (monday first) and hour
+        """
+        window = self._slice(start, end)
+        cells = self.weekday[window].astype(numpy.int64) * 24 + self.hour[window]
+        return numpy.bincount(cells, minlength=7 * 24).reshape(7, 24)
+
+    def daily(self, start: Time = None, end: Time = None) -> Tuple[List[datetime], "numpy.ndarray"]:
+        """
+        Plays of every day that starts between start and end, including days without plays
+        :return: (list of midnights, int64 array of plays)
+        """
+        first = max(self._day(start, 0), 0)
+        last = min(self._day(end, len(self.days)), len(self.days))
+        if first >= last:
+            return [], numpy.zeros(0, dtype=numpy.int64)
+        return [self._date(day) for day in range(first, last)], self.days[first:last]
+
+    def daily_plays(self, start: Time = None, end: Time = None) -> int:
+        """
+        Same as plays but counts whole days only, in constant time from the prefix sum of plays per day
+        """
+        first = min(max(self._day(start, 0), 0), len(self.days))
+        last = min(max(self._day(end, len(self.days)), first), len(self.days))
+        return int(self.cumulative[last] - self.cumulative[first])
+
+    def _runs(self, minimum: int, start: Time, end: Time) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+        first = max(self._day(start, 0), 0)
+        last = min(self._day(end, len(self.days)), len(self.days))
+        if first >= last:
+            return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+        active = numpy.concatenate(([False], self.days[first:last] >= minimum, [False]))
+        edges = numpy.flatnonzero(numpy.diff(active.astype(numpy.int8)))
+        return edges[::2] + first, edges[1::2] + first  # first day and day after the last of every run
+
+    def _streak(self, start: int, stop: int) -> Streak:
+        return Streak(self._date(start), stop - start, int(self.cumulative[stop] - self.cumulative[start]))
+
+    def streaks(self, minimum: int = 1, start: Time = None, end: Time = None) -> List[Streak]:
+        """
+        Runs of consecutive days with at least minimum plays, longest first
+        :param minimum: Plays a day needs to count towards a streak
+        :return: list of Streak
+        """
+        starts, stops = self._runs(minimum, start, end)
+        return [self._streak(int(starts[index]), int(stops[index]))
+                for index in numpy.lexsort((starts, starts - stops))]
+
+    def longest_streak(self, minimum: int = 1, start: Time = None, end: Time = None) -> Streak:
+        """
+        :return: The longest Streak, or None if no day has minimum plays
+        """
+        streaks = self.streaks(minimum, start, end)
+        return streaks[0] if streaks else None
+
+    def current_streak(self, minimum: int = 1, now: Time = None) -> Streak:
+        """
+        :param now: Defaults to the current time
+        :return: The Streak that includes today or yesterday (today may not have plays yet), or None
+        """
+        today = (_seconds(now, int(datetime.now().timestamp())) + self.utc_offset) // DAY - self.first_day
+        starts, stops = self._runs(minimum, None, None)
+        if not len(stops) or stops[-1] < today:
+            return None
+        return self._streak(int(starts[-1]), int(stops[-1]))
+
+    def diversity(self, column: str = "artist", start: Time = None, end: Time = None) -> Diversity:
+        """
+        How spread out plays are over different artists, albums or tracks between start and end
+        :param column: artist, album or track
+        :return: Diversity
+        """
+        counts = self.counts(column, start, end)
+        counts = counts[counts > 0]
+        if not len(counts):
+            return Diversity(0, 0.0, 0.0, 0.0)
+        shares = counts / counts.sum()
+        entropy = float(-(shares * numpy.log2(shares)).sum())
+        evenness = entropy / numpy.log2(len(counts)) if len(counts) > 1 else 1.0
+        return Diversity(len(counts), entropy, float(evenness), float(shares.max()))
@@ -0,0 +1,206 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from . import decoding
+from . import utils
+
+
+class EntityStore:
+    """
+    SQLite file of artist.getinfo, album.getinfo and track.getinfo responses that outlives the process
+    Entities are indexed by normalized names and by mbid, the most recently used ones are also kept in memory
+    The file is compacted to the maxsize most recently used entities once it grows past it
+    Responses requested for a username hold that user's play counts and are not stored
+    """
+
+    def __init__(self, path: str = "lastfmpy-entities.sqlite", *, maxsize: int = 1000000, ttl: float = 30 * utils.DAY,
+                 memory: int = 10000):
+        """
+        :param path: File the entities are stored in
+        :param maxsize: Amount of entities kept on disk
+        :param ttl: Seconds an entity is used for before it is requested again (None to use it forever)
+        :param memory: Amount of entities kept decoded in memory
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.memory = memory
+        self._entries = OrderedDict()  # (kind, key) -> (alias, stored_at, json)
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entities (kind TEXT, key TEXT, mbid TEXT, alias INTEGER, stored_at REAL, "
+            "used_at REAL, value TEXT, PRIMARY KEY (kind, key))")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entities_mbid ON entities (kind, mbid) WHERE mbid != ''")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entities_used_at ON entities (used_at)")
+        self._size = len(self)
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, stored_at: float) -> bool:
+        return self.ttl is None or time.time() - stored_at <= self.ttl
+
+    def _remember(self, kind: str, key: str, alias: int, stored_at: float, value: dict):
+        self._entries[kind, key] = (alias, stored_at, value)
+        self._entries.move_to_end((kind, key))
+        while len(self._entries) > self.memory:
+            self._entries.popitem(last=False)
+
+    def get(self, kind: str, names: tuple = None, *, mbid: str = None, aliases: bool = True) -> Optional[dict]:
+        """
+        :param kind: artist, album or track
+        :param names: (artist,), (artist, album) or (artist, track)
+        :param mbid: MusicBrainz ID, looked up instead of the names when given
+        :param aliases: Whether names the entity was requested by with autocorrect also match
+        :return: The entity of the stored response if there is one that is not older than ttl, None otherwise
+        """
+        if mbid:
+            row = self._connection.execute("SELECT key, alias, stored_at, value FROM entities WHERE kind = ? AND "
+                                           "mbid = ?", (kind, mbid)).fetchone()
+        else:
+            key = utils.names_key(names)
+            entry = self._entries.get((kind, key))
+            if entry is not None and (aliases or not entry[0]) and self._fresh(entry[1]):
+                self._entries.move_to_end((kind, key))
+                self.hits += 1
+                return entry[2]
+            row = self._connection.execute("SELECT key, alias, stored_at, value FROM entities WHERE kind = ? AND "
+                                           "key = ?", (kind, key)).fetchone()
+        if row is None or (row[1] and not aliases) or not self._fresh(row[2]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._connection.execute("UPDATE entities SET used_at = ? WHERE kind = ? AND key = ?",
+                                 (time.time(), kind, row[0]))
+        value = decoding.loads(row[3])
+        self._remember(kind, row[0], row[1], row[2], value)
+        return value
+
+    def _rows(self, kind: str, value: dict, requested: tuple, stored_at: float) -> list:
+        canonical = utils.names_key(utils.entity_names(kind, value))
+        encoded = json.dumps(value)
+        rows = [(kind, canonical, value.get("mbid") or "", 0, stored_at, stored_at, encoded)]
+        if requested and utils.names_key(requested) != canonical:
+            rows.append((kind, utils.names_key(requested), "", 1, stored_at, stored_at, encoded))
+        return rows
+
+    def set(self, kind: str, value: dict, requested: tuple = None):
+        """
+        Stores the entity of a *.getinfo response under its own names and mbid
+        :param kind: artist, album or track
+        :param value: The entity, for example response["artist"]
+        :param requested: Names it was requested by, stored as an alias when autocorrect changed them
+        """
+        self.set_many(kind, [(value, requested)])
+
+    def set_many(self, kind: str, entities: Iterable[Tuple[dict, Optional[tuple]]]):
+        """
+        Same as set for many entities in one transaction, for example to warm up a new store from an export
+        :param entities: (entity, requested names or None) tuples
+        """
+        stored_at = time.time()
+        entities = [(value, self._rows(kind, value, requested, stored_at)) for value, requested in entities]
+        rows = [row for _, entity_rows in entities for row in entity_rows]
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany("INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        for value, entity_rows in entities:
+            for row in entity_rows:
+                if (kind, row[1]) in self._entries:
+                    self._remember(kind, row[1], row[3], stored_at, value)
+        self._size += len(rows)
+        if self._size > self.maxsize:
+            self.compact()
+
+    def warm(self, limit: int = None) -> int:
+        """
+        Decodes the most recently used entities into memory so that the first lookups do not read the file
+        :param limit: Amount of entities, defaults to memory
+        :return: Amount of entities loaded
+        """
+        limit = min(limit or self.memory, self.memory)
+        rows = self._connection.execute("SELECT kind, key, alias, stored_at, value FROM entities ORDER BY used_at "
+                                        "DESC LIMIT ?", (limit,)).fetchall()
+        for kind, key, alias, stored_at, value in reversed(rows):
+            self._remember(kind, key, alias, stored_at, decoding.loads(value))
+        return len(rows)
+
+    def export(self, kind: str = None) -> Iterable[Tuple[str, dict]]:
+        """
+        :param kind: Only export entities of this kind
+        :return: Iterator of (kind, entity) tuples of every stored entity, without aliases
+        """
+        query = "SELECT kind, value FROM entities WHERE alias = 0"
+        parameters = ()
+        if kind is not None:
+            query += " AND kind = ?"
+            parameters = (kind,)
+        for kind_, value in self._connection.execute(query, parameters):
+            yield kind_, decoding.loads(value)
+
+    def compact(self, maxsize: int = None, *, vacuum: bool = False) -> int:
+        """
+        Deletes expired entities and the least recently used ones past maxsize
+        :param maxsize: Amount of entities to keep, defaults to 90% of the maxsize of the store
+        :param vacuum: Whether to also shrink the file on disk, which rewrites all of it
+        :return: Amount of entities deleted
+        """
+        maxsize = int(self.maxsize * 0.9) if maxsize is None else maxsize
+        with self._connection:
+            self._connection.execute("BEGIN")
+            deleted = 0
+            if self.ttl is not None:
+                deleted += self._connection.execute("DELETE FROM entities WHERE stored_at < ?",
+                                                    (time.time() - self.ttl,)).rowcount
+            overflow = len(self) - maxsize
+            if overflow > 0:
+                deleted += self._connection.execute(
+                    "DELETE FROM entities WHERE rowid IN (SELECT rowid FROM entities ORDER BY used_at LIMIT ?)",
+                    (overflow,)).rowcount
+        if vacuum:
+            self._connection.execute("VACUUM")
+        self._size = len(self)
+        return deleted
+
+    def delete(self, kind: str, names: tuple):
+        self._entries.pop((kind, utils.names_key(names)), None)
+        self._connection.execute("DELETE FROM entities WHERE kind = ? AND key = ?", (kind, utils.names_key(names)))
+
+    def clear(self):
+        self._entries.clear()
+        self._connection.execute("DELETE FROM entities")
+        self._size = 0
+        self.hits = self.misses = 0
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
@@ -0,0 +1,160 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from typing import List, NamedTuple, Optional
+
+from . import objects
+
+
+class Checkpoint(NamedTuple):
+    """
+    The newest scrobble timestamp seen for a user and the scrobbles seen at exactly that timestamp
+    """
+    uts: int
+    keys: frozenset  # (track name, artist name) tuples
+
+
+def _key(track: objects.Track) -> tuple:
+    return track.name, str(track.artist)
+
+
+class CheckpointStore:
+    """
+    Interface of the storage used by ScrobbleSync to remember where each user was synced up to
+    """
+
+    def get(self, user: str) -> Optional[Checkpoint]:
+        raise NotImplementedError
+
+    def set(self, user: str, checkpoint: Checkpoint):
+        raise NotImplementedError
+
+    def delete(self, user: str):
+        raise NotImplementedError
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    def __init__(self):
+        self._checkpoints = {}
+
+    def get(self, user: str) -> Optional[Checkpoint]:
+        return self._checkpoints.get(user.lower())
+
+    def set(self, user: str, checkpoint: Checkpoint):
+        self._checkpoints[user.lower()] = checkpoint
+
+    def delete(self, user: str):
+        self._checkpoints.pop(user.lower(), None)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    def __init__(self, path: str = "lastfmpy-sync.sqlite"):
+        self.path = path
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (user TEXT PRIMARY KEY, uts INTEGER, keys TEXT)")
+
+    def get(self, user: str) -> Optional[Checkpoint]:
+        row = self._connection.execute("SELECT uts, keys FROM checkpoints WHERE user = ?", (user.lower(),)).fetchone()
+        if row is None:
+            return None
+        return Checkpoint(row[0], frozenset(tuple(key) for key in json.loads(row[1])))
+
+    def set(self, user: str, checkpoint: Checkpoint):
+        self._connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                                 (user.lower(), checkpoint.uts, json.dumps(sorted(checkpoint.keys))))
+
+    def delete(self, user: str):
+        self._connection.execute("DELETE FROM checkpoints WHERE user = ?", (user.lower(),))
+
+    def close(self):
+        self._connection.close()
+
+
+class ScrobbleSync:
+    """
+    Fetches only the scrobbles of a user that are newer than the last sync
+    """
+
+    def __init__(self, client, store: CheckpointStore = None, *, limit: int = 200):
+        """
+        :param client: LastFMClient used to make requests
+        :param store: Where checkpoints are kept, defaults to SQLiteCheckpointStore
+        :param limit: Amount of recent tracks requested per page
+        """
+        self.client = client
+        self.store = store if store is not None else SQLiteCheckpointStore()
+        self.limit = limit
+
+    async def sync(self, user: str) -> List[objects.Track]:
+        """
+        Gets the scrobbles made since the last sync of a user and moves the checkpoint forward
+        The first sync of a user fetches their whole history
+        The currently playing track is never included, it is picked up once it has been scrobbled
+        :param user: Username of a user
+        :return: list of objects.Track, oldest first
+        """
+        checkpoint = self.store.get(user)
+        if checkpoint is None:
+            tracks = self.client.user.export_recent_tracks(user, limit=self.limit)
+        else:
+            # last.fm treats from as inclusive, so scrobbles at the checkpoint itself are filtered by key below
+            # the end is pinned so that scrobbles made while paging do not shift the pages
+            tracks = self.client.user.iter_recent_tracks(user, limit=self.limit, from_=checkpoint.uts,
+                                                         to=int(time.time()))
+        new = []
+        async for track in tracks:
+            timestamp = track.uts
+            if checkpoint is not None and (timestamp < checkpoint.uts or (
+                    timestamp == checkpoint.uts and _key(track) in checkpoint.keys)):
+                continue
+            new.append(track)
+        new.reverse()
+        if new:
+            newest = new[-1].uts
+            keys = {_key(track) for track in new if track.uts == newest}
+            if checkpoint is not None and checkpoint.uts == newest:
+                keys |= checkpoint.keys
+            self.store.set(user, Checkpoint(newest, frozenset(keys)))
+        return new
+
+    async def sync_many(self, users: List[str], *, concurrency: int = 8) -> dict:
+        """
+        Syncs several users at once
+        :param users: Usernames
+        :param concurrency: Maximum amount of users being synced at once
+        :return: dict of username to the list of objects.Track or the exception raised while syncing them
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def sync(user):
+            async with semaphore:
+                return await self.sync(user)
+
+        results = await asyncio.gather(*[sync(user) for user in users], return_exceptions=True)
+        return dict(zip(users, results))
@@ -0,0 +1,67 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unicodedata
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+def normalize(name: str) -> str:
+    """
+    Normalizes a name the way last.fm compares them: unicode compatibility form, case and whitespace are ignored
+    :param name: Artist, album or track name
+    :return: str
+    """
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split()) if name else ""
+
+
+def text(value) -> str:
+    """
+    :param value: A name, or an artist/album object of a response that holds it in name or #text
+    :return: str, empty if there is no name
+    """
+    if isinstance(value, dict):
+        return value.get("name") or value.get("#text") or ""
+    return value or ""
+
+
+def entity_names(kind: str, json: dict) -> tuple:
+    """
+    :param kind: artist, album or track
+    :param json: An artist, album or track object of a response
+    :return: (artist,), (artist, album) or (artist, track)
+    """
+    if kind == "artist":
+        return text(json),
+    return text(json.get("artist")), text(json)
+
+
+def names_key(names: tuple) -> str:
+    """
+    :param names: (artist,), (artist, album) or (artist, track)
+    :return: str that is equal for names that only differ in case, whitespace or unicode form
+    """
+    return "\x1f".join(normalize(name) for name in names)
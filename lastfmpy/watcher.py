@@ -0,0 +1,244 @@
+"""
+MIT License
+
+Copyright (c) 2020 Myer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import AsyncIterator, Awaitable, Callable, NamedTuple, Optional
+
+from . import objects
+from .ratelimit import RateLimiter
+
+STARTED = "started"
+CHANGED = "changed"
+STOPPED = "stopped"
+
+
+class NowPlayingEvent(NamedTuple):
+    type: str  # STARTED, CHANGED or STOPPED
+    user: str
+    track: Optional[objects.Track]  # None when stopped
+    previous: Optional[objects.Track]  # None when started
+
+
+class _Subscription:
+    __slots__ = ("user", "track", "interval", "due")
+
+    def __init__(self, user: str, interval: float):
+        self.user = user
+        self.track = None
+        self.interval = interval
+        self.due = 0.0
+
+
+def _key(track: objects.Track) -> tuple:
+    return track.name, str(track.artist)
+
+
+class NowPlayingWatcher:
+    """
+    Polls the now playing track of many users on one scheduler and emits an event whenever it changes
+    Users that are listening are polled often, users that are idle are polled less and less often
+    Events are passed to the listeners added with listen and can be iterated over with async for
+    """
+
+    def __init__(self, client, *, budget: float = 2.0, concurrency: int = 8, active_interval: float = 15.0,
+                 recent_interval: float = 60.0, idle_interval: float = 120.0, max_interval: float = 900.0,
+                 recent: float = 1800.0):
+        """
+        :param client: LastFMClient used to make requests
+        :param budget: Requests per second the watcher may make in total
+        :param concurrency: Maximum amount of requests being made at once
+        :param active_interval: Seconds between polls of a user that is playing something
+        :param recent_interval: Seconds between polls of a user that scrobbled within the last recent seconds
+        :param idle_interval: Seconds between polls of a user that has been idle for longer, doubled after every
+        poll that finds them still idle
+        :param max_interval: Seconds between polls will never be longer than this
+        :param recent: Seconds after their last scrobble during which a user counts as recently active
+        """
+        self.client = client
+        self.active_interval = active_interval
+        self.recent_interval = recent_interval
+        self.idle_interval = idle_interval
+        self.max_interval = max_interval
+        self.recent = recent
+        self.polls = 0
+        self.errors = 0
+        self._limiter = RateLimiter(budget, max(1, int(budget)))
+        self._concurrency = concurrency
+        self._subscriptions = {}
+        self._schedule = []
+        self._order = itertools.count()
+        self._listeners = []
+        self._queues = []
+        self._wakeup = None
+        self._task = None
+        self._tasks = set()  # polls and listener calls in flight, referenced so they are not garbage collected
+
+    def subscribe(self, user: str):
+        """
+        Starts watching a user, they are polled as soon as possible
+        """
+        if user.lower() in self._subscriptions:
+            return
+        subscription = self._subscriptions[user.lower()] = _Subscription(user, self.active_interval)
+        self._push(subscription, 0)
+
+    def unsubscribe(self, user: str):
+        self._subscriptions.pop(user.lower(), None)
+
+    @property
+    def users(self) -> list:
+        return [subscription.user for subscription in self._subscriptions.values()]
+
+    def listen(self, listener: Callable[[NowPlayingEvent], Awaitable]):
+        """
+        Adds a coroutine function that is called with every NowPlayingEvent, can be used as a decorator
+        """
+        self._listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener: Callable[[NowPlayingEvent], Awaitable]):
+        self._listeners.remove(listener)
+
+    def start(self):
+        """
+        Starts the scheduler in the background
+        """
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """
+        Stops the scheduler and cancels the polls and listener calls still in flight
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.stop()
+
+    async def __aiter__(self) -> AsyncIterator[NowPlayingEvent]:
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    def _push(self, subscription: _Subscription, delay: float):
+        subscription.due = time.monotonic() + delay
+        heapq.heappush(self._schedule, (subscription.due, next(self._order), subscription))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self._concurrency)
+        while True:
+            if not self._schedule:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            due, _, subscription = self._schedule[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._schedule)
+            if self._subscriptions.get(subscription.user.lower()) is not subscription or subscription.due != due:
+                continue  # unsubscribed or rescheduled since
+            await self._limiter.acquire()
+            await semaphore.acquire()
+            self._spawn(self._poll(subscription, semaphore))
+
+    async def _poll(self, subscription: _Subscription, semaphore: asyncio.Semaphore):
+        try:
+            self.polls += 1
+            recent = await self.client.user.get_recent_tracks(subscription.user, limit=1)
+        except Exception:
+            self.errors += 1
+            subscription.interval = min(self.max_interval, subscription.interval * 2)
+            self._push(subscription, subscription.interval)
+            return
+        finally:
+            semaphore.release()
+        latest = recent.items[0] if recent.items else None
+        track = latest if latest is not None and latest.playing else None
+        previous = subscription.track
+        subscription.track = track
+        if track is not None:
+            subscription.interval = self.active_interval
+        elif latest is not None and time.time() - latest.uts < self.recent:
+            subscription.interval = self.recent_interval
+        else:
+            subscription.interval = min(self.max_interval, max(self.idle_interval, subscription.interval * 2))
+        if self._subscriptions.get(subscription.user.lower()) is subscription:
+            self._push(subscription, subscription.interval)
+        if previous is None and track is not None:
+            self._emit(NowPlayingEvent(STARTED, subscription.user, track, None))
+        elif previous is not None and track is None:
+            self._emit(NowPlayingEvent(STOPPED, subscription.user, None, previous))
+        elif previous is not None and _key(previous) != _key(track):
+            self._emit(NowPlayingEvent(CHANGED, subscription.user, track, previous))
+
+    def _emit(self, event: NowPlayingEvent):
+        for queue in self._queues:
+            queue.put_nowait(event)
+        for listener in self._listeners:
+            self._spawn(listener(event)).add_done_callback(_report)
+
+    def _spawn(self, coroutine: Awaitable) -> asyncio.Future:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+def _report(task: asyncio.Future):
+    if not task.cancelled() and task.exception() is not None:
+        asyncio.get_event_loop().call_exception_handler({
+            "message": "Exception in NowPlayingWatcher listener",
+            "exception": task.exception(),
+            "future": task,
+        })
@@ -43,4 +43,11 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     python_requires='>=3.6',
+    extras_require={
+        "speedups": ["orjson"],
+        "numpy": ["numpy"],
+        "arrow": ["numpy", "pyarrow"],
+        "streaming": ["ijson"],
+        "prometheus": ["prometheus_client"],
+    },
 )